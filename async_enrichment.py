@@ -0,0 +1,441 @@
+import asyncio
+import contextvars
+import csv
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+from urllib.parse import urlparse
+
+from async_transport import AsyncHttpTransport
+from checkpoint import RunCheckpoint
+from structured_output import AnalysisValidationError, build_reask_prompt, parse_analysis
+from lead_enrichment_bot import FAILED_PITCH, FAILED_SUMMARY, CompanyData, LeadEnrichmentBot
+from throttling import AsyncKeyedSemaphore
+from result_table import ResultTable
+from web_page import HtmlTextExtractor, WebPage, charset_from_content_type
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+
+async def _aiterate(items):
+    """Iterate a plain or async iterable from a coroutine."""
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+class AsyncLeadEnrichmentBot(LeadEnrichmentBot):
+    """LeadEnrichmentBot for asyncio services: searches, page fetches and LLM calls never block the loop.
+
+    Configuration, caching, rate limits, classification and response parsing are
+    shared with the sync bot; only the I/O is async. Domain verification (DNS
+    plus a HEAD probe) still runs on the sync transport in a worker thread.
+    """
+
+    def __init__(self, *args, async_transport: Optional[AsyncHttpTransport] = None,
+                 row_timeout: Optional[float] = None, blocking_workers: int = 64, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.row_timeout = row_timeout
+        # asyncio's default pool is sized by CPU count, far too small for calls that mostly wait on I/O
+        self._blocking_pool = ThreadPoolExecutor(max_workers=blocking_workers, thread_name_prefix='async-blocking')
+        self.async_transport = async_transport or AsyncHttpTransport(headers=dict(self.headers))
+        if self.async_transport.rate_limits is None:
+            self.async_transport.rate_limits = self.domain_rates
+        self.async_host_limits = AsyncKeyedSemaphore(self.host_limits.limit)
+        self.async_provider_limits = AsyncKeyedSemaphore(self.provider_limits.limit)
+
+    async def __aenter__(self) -> 'AsyncLeadEnrichmentBot':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.async_transport.close()
+        self._blocking_pool.shutdown(wait=False)
+
+    async def _run_blocking(self, func, *args):
+        """Run a blocking call on the bot's thread pool, keeping the caller's context for row timings."""
+        call = partial(contextvars.copy_context().run, func, *args)
+        return await asyncio.get_running_loop().run_in_executor(self._blocking_pool, call)
+
+    async def _alookup_company_website(self, company_name: str) -> Optional[str]:
+        async with self.async_host_limits.hold(urlparse(self.search_api_url).netloc):
+            response = await self.async_transport.get(self._search_url(company_name), timeout=10)
+            async with response:
+                if response.status != 200:
+                    return None
+                data = await response.json(content_type=None)
+        return self._website_from_search(company_name, data)
+
+    async def asearch_company_website(self, company_name: str) -> str:
+        cached = self._cache_get('search', company_name)
+        if cached:
+            return cached
+
+        known = self.domain_resolver.lookup(company_name)
+        if known:
+            self.metrics.increment('domain_index_hits')
+            return known
+
+        found = None
+        try:
+            with self.metrics.timer('search'):
+                found = await self._alookup_company_website(company_name)
+        except Exception as e:
+            self.metrics.record_error('search', e)
+            logger.warning(f"Error searching for {company_name} website: {e}")
+
+        with self.metrics.timer('resolve'):
+            website = await self._run_blocking(self.domain_resolver.resolve, company_name, found)
+        if not website:
+            self.metrics.increment('unresolved_domains')
+            return 'Unknown'
+
+        self._cache_set('search', website, company_name)
+        return website
+
+    async def afetch_page(self, url: str) -> WebPage:
+        cached = self._cached_page(url)
+        if cached:
+            return cached
+
+        page = WebPage(url=url, final_url=url)
+        try:
+            async with self.async_host_limits.hold(urlparse(url).netloc):
+                started = time.perf_counter()
+                response = await self.async_transport.get(url, timeout=15)
+                async with response:
+                    page.status_code = response.status
+                    page.final_url = str(response.url) or url
+                    parse_seconds = 0.0
+                    encoding = charset_from_content_type(response.headers.get('Content-Type'))
+                    if response.status == 200 and self.parse_pool is not None:
+                        received = bytearray()
+                        async for chunk in response.content.iter_chunked(16384):
+                            received += chunk
+                            if len(received) >= self.max_page_bytes:
+                                page.truncated = True
+                                break
+                        page.content = bytes(received)
+                    elif response.status == 200:
+                        extractor = HtmlTextExtractor(encoding=encoding)
+                        received = bytearray()
+                        async for chunk in response.content.iter_chunked(16384):
+                            received += chunk
+                            parse_started = time.perf_counter()
+                            enough = extractor.feed(chunk)
+                            parse_seconds += time.perf_counter() - parse_started
+                            if enough or len(received) >= self.max_page_bytes:
+                                page.truncated = True
+                                break
+                        page.content = bytes(received)
+                        parse_started = time.perf_counter()
+                        page.meta_description, page.text = extractor.result()
+                        parse_seconds += time.perf_counter() - parse_started
+            if page.content and self.parse_pool is not None:
+                parse_started = time.perf_counter()
+                page.meta_description, page.text, page.industry, page.industry_confidence = \
+                    await self.parse_pool.aparse(page.content, encoding)
+                parse_seconds = time.perf_counter() - parse_started
+            self._record_page(page, time.perf_counter() - started - parse_seconds, parse_seconds)
+        except Exception as e:
+            self.metrics.record_error('fetch', e)
+            logger.warning(f"Error fetching {url}: {e}")
+        return page
+
+    async def aget_company_basic_info(self, company_name: str) -> Dict[str, object]:
+        try:
+            website = await self.asearch_company_website(company_name)
+            page = await self.afetch_page(website) if website != 'Unknown' else None
+            industry, confidence = self._page_industry(page)
+            return {
+                'website': website,
+                'industry': industry,
+                'industry_confidence': confidence,
+                'company_size': 'Unknown',
+                'location': 'Unknown',
+                'page': page
+            }
+        except Exception as e:
+            logger.error(f"Error getting basic info for {company_name}: {e}")
+            return {
+                'website': 'Unknown',
+                'industry': 'Unknown',
+                'company_size': 'Unknown',
+                'location': 'Unknown',
+                'page': None
+            }
+
+    async def acollect_company_info(self, company_name: str) -> Tuple[CompanyData, str]:
+        logger.info(f"Enriching data for: {company_name}")
+        company = CompanyData(name=company_name)
+        with self.metrics.track_row() as timings:
+            basic_info = await self.aget_company_basic_info(company_name)
+        company.timings.update(timings)
+        company.website = basic_info['website']
+        company.industry = basic_info['industry']
+        company.industry_confidence = basic_info.get('industry_confidence', 0.0)
+        company.company_size = basic_info['company_size']
+        company.location = basic_info['location']
+
+        website_content = ""
+        page = basic_info.get('page')
+        if company.website and company.website != 'Unknown':
+            if page is None or page.url != company.website:
+                page = await self.afetch_page(company.website)
+            website_content = page.text if page.ok else ""
+        return company, website_content
+
+    async def _acomplete(self, provider: str, prompt: str, max_tokens: int = 300, json_output: bool = False) -> str:
+        limiter = self.provider_rates.get(provider)
+        with self.metrics.timer('rate_limit_wait'):
+            await limiter.acquire_async(tokens=len(prompt) // 4 + max_tokens)
+        try:
+            with self.metrics.timer('llm'):
+                async with self.async_provider_limits.hold(provider):
+                    started = time.perf_counter()
+                    if provider == 'gemini' and self.gemini_api_endpoint:
+                        # The SDK's REST transport (used for custom endpoints) has no async client
+                        response = await self._run_blocking(
+                            partial(self.gemini_model.generate_content, prompt, **self._gemini_options(json_output)))
+                    elif provider == 'gemini':
+                        response = await self.gemini_model.generate_content_async(prompt, **self._gemini_options(json_output))
+                    else:
+                        import openai
+                        # Share the pooled session instead of letting the SDK open one per call
+                        openai.aiosession.set(self.async_transport.session)
+                        response = await openai.ChatCompletion.acreate(**self._openai_request(prompt, max_tokens, json_output))
+                    seconds = time.perf_counter() - started
+        except Exception as e:
+            self._record_llm_failure(provider, limiter, e)
+            raise
+        return self._record_llm_success(provider, limiter, prompt, response, seconds)
+
+    async def _aanalyze_attempt(self, provider: str, company_name: str, website_content: str,
+                                industry: str) -> Tuple[str, str, bool]:
+        prompt = self._analysis_prompt(provider, company_name, website_content, industry)
+        model = self._model_name(provider)
+        cached = self._cache_get('llm', provider, model, prompt)
+        if cached:
+            return cached[0], cached[1], True
+
+        content = await self._acomplete(provider, prompt, json_output=True)
+        reasks = 0
+        while True:
+            try:
+                result = parse_analysis(content)
+                break
+            except AnalysisValidationError as e:
+                if not self._should_reask(provider, e, reasks):
+                    return self._fallback_analysis(provider, content) + (False,)
+                reasks += 1
+                content = await self._acomplete(provider, build_reask_prompt(prompt, content, e), json_output=True)
+
+        self.metrics.increment('llm_parse_ok' if reasks == 0 else 'llm_parse_reask_ok')
+        self._cache_set('llm', list(result), provider, model, prompt)
+        return result + (True,)
+
+    async def aanalyze_with_openai(self, company_name: str, website_content: str, industry: str) -> Tuple[str, str]:
+        try:
+            return (await self._aanalyze_attempt('openai', company_name, website_content, industry))[:2]
+        except Exception as e:
+            logger.error(f"OpenAI API error for {company_name}: {e}")
+            return FAILED_SUMMARY, FAILED_PITCH
+
+    async def aanalyze_with_gemini(self, company_name: str, website_content: str, industry: str) -> Tuple[str, str]:
+        try:
+            return (await self._aanalyze_attempt('gemini', company_name, website_content, industry))[:2]
+        except Exception as e:
+            logger.error(f"Gemini API error for {company_name}: {e}")
+            return FAILED_SUMMARY, FAILED_PITCH
+
+    async def aanalyze_with_router(self, company_name: str, website_content: str,
+                                   industry: str) -> Tuple[str, str, bool]:
+        try:
+            return await self.llm_router.acall(
+                lambda provider: self._aanalyze_attempt(provider, company_name, website_content, industry))
+        except Exception as e:
+            logger.error(f"LLM error for {company_name} on every provider: {e}")
+            return FAILED_SUMMARY, FAILED_PITCH, False
+
+    async def aanalyze_company(self, company: CompanyData, website_content: str) -> None:
+        if self._llm_provider() is None:
+            self.analyze_company(company, website_content)
+            return
+
+        with self.metrics.track_row() as timings:
+            summary, pitch, company.llm_analyzed = await self.aanalyze_with_router(
+                company.name, website_content, company.industry)
+        company.timings['llm'] = company.timings.get('llm', 0.0) + timings.get('llm', 0.0)
+        company.summary = summary
+        company.automation_pitch = pitch
+
+    async def aenrich_company(self, company_name: str, timeout: Optional[float] = None) -> CompanyData:
+        """Enrich one company; raises asyncio.TimeoutError if it takes longer than `timeout` (or `row_timeout`).
+
+        With a lead policy, only qualifying leads get an LLM call. Unlike the sync
+        bot, rows are not reordered by score.
+        """
+        async def enrich():
+            company, website_content = await self.acollect_company_info(company_name)
+            if self.lead_policy is None or self._score_lead(company, website_content):
+                await self.aanalyze_company(company, website_content)
+            return company
+
+        timeout = timeout if timeout is not None else self.row_timeout
+        if timeout:
+            return await asyncio.wait_for(enrich(), timeout)
+        return await enrich()
+
+    async def _aenrich_row(self, company_name: str, timeout: Optional[float] = None) -> Dict[str, str]:
+        try:
+            with self.metrics.timer('row'):
+                company = await self.aenrich_company(company_name, timeout)
+            return self._company_row(company)
+        except Exception as e:
+            logger.error(f"Error processing {company_name}: {e!r}")
+            return self._error_row(company_name, e)
+
+    async def _abounded_map(self, func, items, concurrency: int, ordered: bool):
+        """Async generator of (item, await func(item)) with at most `concurrency` calls running.
+
+        In ordered mode finished results wait for the head of the line, with up to
+        `concurrency` of them buffered so one slow row does not stall the rest.
+        Closing the generator (or cancelling whoever iterates it) cancels every
+        call still in flight.
+        """
+        concurrency = max(1, concurrency)
+        pending = deque()
+
+        def pop_finished():
+            if ordered:
+                while pending and pending[0][1].done():
+                    item, task = pending.popleft()
+                    yield item, task.result()
+            else:
+                for item, task in [entry for entry in pending if entry[1].done()]:
+                    pending.remove((item, task))
+                    yield item, task.result()
+
+        try:
+            async for item in _aiterate(items):
+                pending.append((item, asyncio.ensure_future(func(item))))
+                while True:
+                    for finished in pop_finished():
+                        yield finished
+                    running = [task for _, task in pending if not task.done()]
+                    if len(running) < concurrency and len(pending) < concurrency * 2:
+                        break
+                    await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            while pending:
+                running = [task for _, task in pending if not task.done()]
+                if running:
+                    await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for finished in pop_finished():
+                    yield finished
+        finally:
+            tasks = [task for _, task in pending]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def astream_companies(self, company_names, concurrency: int = 100, timeout: Optional[float] = None):
+        """Async generator of CompanyData in completion order, with up to `concurrency` companies in flight.
+
+        `company_names` may be a plain or async iterable. A company that fails or
+        exceeds `timeout` is logged and yielded with 'Error' fields, like the
+        error rows in the CSV output.
+        """
+        async def enrich(company_name):
+            try:
+                with self.metrics.timer('row'):
+                    return await self.aenrich_company(company_name, timeout)
+            except Exception as e:
+                logger.error(f"Error processing {company_name}: {e!r}")
+                self.metrics.record_error('row', e)
+                return CompanyData(name=company_name, website='Error', industry='Error',
+                                   summary=f'Error processing: {str(e)}',
+                                   automation_pitch='Unable to generate pitch')
+
+        results = self._abounded_map(enrich, company_names, concurrency, ordered=False)
+        try:
+            async for _, company in results:
+                yield company
+        finally:
+            await results.aclose()
+
+    async def aenrich_many(self, company_names, concurrency: int = 100, timeout: Optional[float] = None):
+        """Async generator of (company_name, row) pairs in input order, like `enrich_many`."""
+        async def enrich(company_name):
+            return await self._aenrich_row(company_name, timeout)
+
+        results = self._abounded_map(enrich, company_names, concurrency, ordered=True)
+        try:
+            async for company_name, row in results:
+                yield company_name, row
+        finally:
+            await results.aclose()
+
+    async def astream_csv(self, input_file: str, output_file: str, concurrency: int = 100,
+                          resume: bool = False, chunksize: int = 1000, timeout: Optional[float] = None) -> int:
+        """Async `stream_csv`: rows are written in input order and checkpointed as they finish."""
+        checkpoint = RunCheckpoint(output_file)
+        rows_done, complete = self._resume_output(checkpoint, input_file, output_file, resume)
+        if complete:
+            return rows_done
+
+        mode = 'a' if rows_done else 'w'
+        with open(output_file, mode, newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self.output_columns, lineterminator='\n')
+            if not rows_done:
+                writer.writeheader()
+                f.flush()
+                checkpoint.save(input_file, 0, f.tell())
+
+            company_names = self.iter_csv_companies(input_file, chunksize=chunksize, skip_rows=rows_done)
+            async for company_name, row in self.aenrich_many(company_names, concurrency, timeout):
+                writer.writerow(row)
+                f.flush()
+                rows_done += 1
+                checkpoint.save(input_file, rows_done, f.tell())
+                logger.info(f"Processed {rows_done}: {company_name}")
+
+            checkpoint.save(input_file, rows_done, f.tell(), complete=True)
+
+        logger.info(f"Results saved to {output_file}")
+        return rows_done
+
+    async def aprocess_csv(self, input_file: str, output_file: str = None, concurrency: int = 100,
+                           resume: bool = False, chunksize: int = 1000,
+                           timeout: Optional[float] = None) -> 'pd.DataFrame':
+        try:
+            if output_file:
+                await self.astream_csv(input_file, output_file, concurrency=concurrency, resume=resume,
+                                       chunksize=chunksize, timeout=timeout)
+                return self.read_output(output_file)
+
+            logger.info(f"Processing {input_file} with up to {concurrency} companies in flight...")
+
+            results = ResultTable(self.output_columns)
+            company_names = self.iter_csv_companies(input_file, chunksize)
+            async for company_name, row in self.aenrich_many(company_names, concurrency, timeout):
+                logger.info(f"Processed {len(results) + 1}: {company_name}")
+                results.append(row)
+
+            return results.to_frame()
+
+        except Exception as e:
+            logger.error(f"Error processing CSV: {e}")
+            raise
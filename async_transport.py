@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import socket
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from http_transport import DEFAULT_HEADERS, RETRY_STATUSES, jittered_backoff, parse_retry_after
+
+
+logger = logging.getLogger(__name__)
+
+
+def is_async_dns_failure(error: Exception) -> bool:
+    return isinstance(error, aiohttp.ClientConnectorError) and isinstance(error.os_error, socket.gaierror)
+
+
+class AsyncHttpTransport:
+    """aiohttp counterpart of HttpTransport: one pooled session, same retry, backoff and rate-limit rules.
+
+    The session is created lazily on first use so it binds to the running event
+    loop; call `close` from that loop when done.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 20, max_retries: int = 3,
+                 backoff_base: float = 0.5, max_backoff: float = 30.0,
+                 headers: Optional[Dict[str, str]] = None, rate_limits=None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.max_retries = max_retries
+        self.rate_limits = rate_limits
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        return jittered_backoff(attempt, self.backoff_base, self.max_backoff, retry_after)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+        return self._session
+
+    async def get(self, url: str, timeout: float = 15, **kwargs) -> aiohttp.ClientResponse:
+        """GET with retries; the caller must `release()` the returned response (or use it as a context manager)."""
+        limiter = self.rate_limits.get(urlparse(url).netloc) if self.rate_limits is not None else None
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        attempt = 0
+        while True:
+            if limiter is not None:
+                await limiter.acquire_async()
+            try:
+                response = await self.session.get(url, timeout=client_timeout, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                # A domain that does not resolve will not resolve on retry either
+                if attempt >= self.max_retries or is_async_dns_failure(e):
+                    raise
+                delay = self.backoff(attempt)
+                logger.debug(f"{type(e).__name__} for {url}; retry {attempt + 1} in {delay:.2f}s")
+            else:
+                if limiter is not None:
+                    if response.status == 429:
+                        limiter.record_throttled()
+                    elif response.status < 500:
+                        limiter.record_success()
+                if response.status not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = self.backoff(attempt, parse_retry_after(response.headers.get('Retry-After')))
+                logger.debug(f"HTTP {response.status} for {url}; retry {attempt + 1} in {delay:.2f}s")
+                response.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,162 @@
+"""Offline throughput benchmark for LeadEnrichmentBot.
+
+Starts the stub servers, then drives `process_csv` (and optionally a plain
+`enrich_company` loop or the asyncio `aprocess_csv`) at several input sizes, each in a fresh process, and
+reports rows/sec, p50/p95 row latency and peak RSS.
+
+    python -m benchmarks.bench_enrichment --sizes 100 1000 10000 --workers 16
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+
+from benchmarks.stub_servers import StubConfig, start_stub_process
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def make_bot(base_url: str, options: dict, bot_class=None):
+    from lead_enrichment_bot import LeadEnrichmentBot
+
+    bot_class = bot_class or LeadEnrichmentBot
+    parse_pool = None
+    if options.get('parse_processes'):
+        from parse_pool import ParsePool
+        parse_pool = ParsePool(options['parse_processes'])
+    provider = options['provider']
+    unlimited = {'requests_per_minute': 1e9, 'tokens_per_minute': 1e12}
+    # Every stub site shares one host, so per-host limits would otherwise serialise the whole run
+    return bot_class(
+        openai_api_key='stub-key' if provider in ('openai', 'both') else None,
+        gemini_api_key='stub-key' if provider in ('gemini', 'both') else None,
+        openai_api_base=f"{base_url}/v1",
+        gemini_api_endpoint=base_url,
+        search_api_url=f"{base_url}/search",
+        max_per_host=options['workers'] * 2,
+        max_per_provider=options['workers'],
+        provider_rates={'gemini': unlimited, 'openai': unlimited},
+        domain_rpm=1e9,
+        parse_pool=parse_pool,
+        **({'prompt_token_budget': options['prompt_token_budget']} if options.get('prompt_token_budget') else {}),
+    )
+
+
+def run_case(base_url: str, mode: str, size: int, options: dict, result_queue) -> None:
+    logging.disable(logging.CRITICAL)
+    if mode == 'aprocess_csv':
+        from async_enrichment import AsyncLeadEnrichmentBot
+        bot = make_bot(base_url, options, AsyncLeadEnrichmentBot)
+    else:
+        bot = make_bot(base_url, options)
+    names = [f"Benchco {idx:06d}" for idx in range(size)]
+    latencies = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        if mode == 'enrich_company':
+            for name in names:
+                row_start = time.perf_counter()
+                bot.enrich_company(name)
+                latencies.append(time.perf_counter() - row_start)
+        else:
+            input_file = os.path.join(workdir, 'input.csv')
+            with open(input_file, 'w', encoding='utf-8') as f:
+                f.write('company_name\n' + '\n'.join(names) + '\n')
+            output_file = os.path.join(workdir, 'output.csv')
+            if mode == 'aprocess_csv':
+                async def run():
+                    async with bot:
+                        await bot.aprocess_csv(input_file, output_file, concurrency=options['workers'])
+                asyncio.run(run())
+            else:
+                bot.process_csv(input_file, output_file,
+                                workers=options['workers'], batch_size=options['llm_batch_size'])
+            latencies = bot.metrics.stages['row'].samples if 'row' in bot.metrics.stages else []
+        elapsed = time.perf_counter() - start
+    if bot.parse_pool is not None:
+        bot.parse_pool.close()
+
+    result_queue.put({
+        'mode': mode,
+        'rows': size,
+        'seconds': round(elapsed, 2),
+        'rows_per_sec': round(size / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 1) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1) if latencies else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'errors': sum(bot.metrics.errors.values()),
+        'parse_success_rate': bot.parse_stats()['success_rate'],
+        'tokens_sent': bot.metrics.counters.get('tokens_sent', 0),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline LeadEnrichmentBot benchmark against local stubs')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--modes', nargs='+', default=['process_csv'], choices=['process_csv', 'enrich_company', 'aprocess_csv'])
+    parser.add_argument('--provider', default='openai', choices=['openai', 'gemini', 'both', 'none'])
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--llm-batch-size', type=int, default=1)
+    parser.add_argument('--parse-processes', type=int, default=0, help='Parse homepages in a process pool of this size')
+    parser.add_argument('--prompt-token-budget', type=int, default=0, help='Website-content tokens per prompt (0 = bot default)')
+    parser.add_argument('--search-latency-ms', type=float, default=20)
+    parser.add_argument('--web-latency-ms', type=float, default=50)
+    parser.add_argument('--llm-latency-ms', type=float, default=300)
+    parser.add_argument('--web-error-rate', type=float, default=0.0)
+    parser.add_argument('--llm-error-rate', type=float, default=0.0)
+    parser.add_argument('--llm-malformed-rate', type=float, default=0.0)
+    parser.add_argument('--corpus-dir', help='Directory of recorded *.html homepages to serve instead of the synthetic corpus')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    config = StubConfig(
+        search_latency_ms=args.search_latency_ms, web_latency_ms=args.web_latency_ms,
+        llm_latency_ms=args.llm_latency_ms, web_error_rate=args.web_error_rate,
+        llm_error_rate=args.llm_error_rate, llm_malformed_rate=args.llm_malformed_rate, corpus_dir=args.corpus_dir,
+    )
+    options = {'provider': args.provider, 'workers': args.workers, 'llm_batch_size': args.llm_batch_size,
+               'parse_processes': args.parse_processes, 'prompt_token_budget': args.prompt_token_budget}
+    stub_process, base_url = start_stub_process(config)
+
+    results = []
+    try:
+        print(f"{'mode':<16}{'rows':>8}{'seconds':>10}{'rows/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'RSS MB':>10}{'errors':>8}{'parsed':>8}{'tokens':>10}")
+        for mode in args.modes:
+            for size in args.sizes:
+                result_queue = multiprocessing.Queue()
+                worker = multiprocessing.Process(target=run_case, args=(base_url, mode, size, options, result_queue))
+                worker.start()
+                result = result_queue.get()
+                worker.join()
+                results.append(result)
+                print(f"{mode:<16}{size:>8}{result['seconds']:>10}{result['rows_per_sec']:>10}"
+                      f"{str(result['p50_ms']):>10}{str(result['p95_ms']):>10}{result['peak_rss_mb']:>10}{result['errors']:>8}{result['parse_success_rate']:>8}{result['tokens_sent']:>10}")
+    finally:
+        stub_process.terminate()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'config': asdict(config), 'options': options, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Startup-time benchmark for the CLI and the worker processes it spawns.
+
+Each case runs in a fresh interpreter several times and reports the median
+wall time, plus which heavy modules ended up imported.
+
+    python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['pandas', 'openai', 'google.generativeai', 'pyarrow', 'aiohttp', 'lxml', 'requests']
+CASES = {
+    'import lead_enrichment_bot': 'import lead_enrichment_bot',
+    'construct bot (no keys)': 'import lead_enrichment_bot; lead_enrichment_bot.LeadEnrichmentBot()',
+    'construct bot (openai key)': "import lead_enrichment_bot; lead_enrichment_bot.LeadEnrichmentBot(openai_api_key='x')",
+    'import parse_pool (spawned worker)': 'import parse_pool',
+    'import async_enrichment': 'import async_enrichment',
+}
+REPORT = "; import sys, json; print(json.dumps([m for m in %r if m in sys.modules]))" % (HEAVY_MODULES,)
+
+
+def time_case(code: str, runs: int):
+    samples, loaded = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-W', 'ignore', '-c', code + REPORT], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(time.perf_counter() - start)
+        loaded = json.loads(output.strip().splitlines()[-1])
+    return statistics.median(samples), loaded
+
+
+def time_cli_help(runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-W', 'ignore', 'lead_enrichment_bot.py', '--help'], cwd=REPO_ROOT,
+                       capture_output=True, check=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Interpreter startup and import cost of the enrichment modules')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    baseline, _ = time_case('pass', args.runs)
+    results = [{'case': 'python -c pass', 'seconds': round(baseline, 3), 'heavy_modules': []}]
+    for name, code in CASES.items():
+        seconds, loaded = time_case(code, args.runs)
+        results.append({'case': name, 'seconds': round(seconds, 3), 'heavy_modules': loaded})
+    results.append({'case': 'lead_enrichment_bot.py --help', 'seconds': round(time_cli_help(args.runs), 3),
+                    'heavy_modules': None})
+
+    print(f"{'case':<38}{'median s':>10}  heavy modules loaded")
+    for result in results:
+        loaded = '-' if result['heavy_modules'] is None else ', '.join(result['heavy_modules']) or 'none'
+        print(f"{result['case']:<38}{result['seconds']:>10}  {loaded}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
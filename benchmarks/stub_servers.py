@@ -0,0 +1,228 @@
+"""Local stand-ins for DuckDuckGo, company homepages and the OpenAI/Gemini APIs.
+
+Every route sleeps for its configured latency and fails with its configured
+error rate, so benchmarks exercise the real HTTP, retry and rate-limit paths
+without touching the network or spending API quota.
+"""
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import re
+import sys
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+@dataclass
+class StubConfig:
+    search_latency_ms: float = 20
+    web_latency_ms: float = 50
+    llm_latency_ms: float = 300
+    search_error_rate: float = 0.0
+    web_error_rate: float = 0.0
+    llm_error_rate: float = 0.0
+    # Share of single-company answers that ignore the requested JSON format
+    llm_malformed_rate: float = 0.0
+    corpus_dir: Optional[str] = None
+    corpus_size: int = 50
+    seed: int = 7
+
+
+INDUSTRY_BLURBS = [
+    "We build cloud software and machine learning platforms for modern engineering teams.",
+    "A healthcare provider running clinics and hospital partnerships across the region.",
+    "Digital banking, payments and investment tools for small businesses.",
+    "Online retail marketplace and shopping experiences for millions of customers.",
+    "University-grade online courses and corporate training programmes.",
+    "Industrial manufacturing and automotive component production at scale.",
+    "Commercial real estate development, property management and construction.",
+    "A creative marketing agency delivering brand campaigns and social media growth.",
+]
+
+
+def build_corpus(size: int = 50, seed: int = 7) -> List[bytes]:
+    """Synthetic homepages with realistic boilerplate (scripts, nav, cookie banners) and varied sizes."""
+    rng = random.Random(seed)
+    words = "about team mission product customers solutions platform services contact careers news pricing".split()
+    pages = []
+    for idx in range(size):
+        blurb = INDUSTRY_BLURBS[idx % len(INDUSTRY_BLURBS)]
+        # Most homepages are small; every tenth one is a multi-megabyte page full of markup
+        paragraphs = 2000 if idx % 10 == 9 else rng.randint(5, 80)
+        body = ''.join(
+            f"<p>{' '.join(rng.choice(words) for _ in range(rng.randint(10, 40)))}.</p>"
+            for _ in range(paragraphs)
+        )
+        pages.append((
+            "<!DOCTYPE html><html><head>"
+            f"<title>Company {idx}</title>"
+            f"<meta name=\"description\" content=\"{blurb}\">"
+            "<script>window.dataLayer=[];function track(){return 1}</script>"
+            "<style>body{font-family:sans-serif}.nav{display:flex}</style>"
+            "</head><body>"
+            "<div class=\"cookie\">We use cookies to improve your experience. Accept all cookies</div>"
+            "<nav><a href=\"/\">Home</a><a href=\"/about\">About</a><a href=\"/pricing\">Pricing</a></nav>"
+            "<header><h1>Welcome</h1></header>"
+            f"<section id=\"about\"><h2>About us</h2><p>{blurb}</p></section>"
+            f"<main>{body}</main>"
+            "<footer>&copy; Company. All rights reserved.</footer>"
+            "</body></html>"
+        ).encode('utf-8'))
+    return pages
+
+
+def load_corpus(config: StubConfig) -> List[bytes]:
+    if config.corpus_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(config.corpus_dir, '*.html'))):
+            with open(path, 'rb') as f:
+                pages.append(f.read())
+        if pages:
+            return pages
+    return build_corpus(config.corpus_size, config.seed)
+
+
+# Stub homepages never change while a server runs; the ETag is derived from the page body
+STUB_LAST_MODIFIED = 'Mon, 05 Jan 2026 09:00:00 GMT'
+
+
+def _slug(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'company'
+
+
+def _llm_answer(prompt: str, malformed: bool = False) -> str:
+    if 'Companies:' in prompt:
+        companies = json.loads(prompt.split('Companies:', 1)[1])
+        return json.dumps([
+            {'id': c['id'], 'summary': f"{c['company']} operates in {c['industry']}.",
+             'pitch': f"QF Innovate can automate reporting for {c['company']}."}
+            for c in companies
+        ])
+    match = re.search(r'Company:\s*(.+)', prompt)
+    company = match.group(1).strip() if match else 'The company'
+    if 'JSON object' in prompt and not malformed:
+        return json.dumps({'summary': f"{company} provides services to its customers.",
+                           'pitch': f"QF Innovate can automate {company}'s back office."})
+    return f"SUMMARY: {company} provides services to its customers.\nPITCH: QF Innovate can automate {company}'s back office."
+
+
+def make_handler(config: StubConfig, corpus: List[bytes]):
+    rng = random.Random(config.seed)
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str = 'application/json', headers=None):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _delay(self, latency_ms: float):
+            if latency_ms:
+                # Exponential jitter around the mean gives a realistic long tail
+                time.sleep(rng.expovariate(1000.0 / latency_ms))
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            host = self.headers.get('Host', 'localhost')
+            if parsed.path == '/search':
+                self._delay(config.search_latency_ms)
+                if rng.random() < config.search_error_rate:
+                    return self._send(503, b'{}')
+                name = parse_qs(parsed.query).get('q', [''])[0]
+                answer = {'Answer': f"Official site: http://{host}/sites/{_slug(name)}", 'RelatedTopics': []}
+                return self._send(200, json.dumps(answer).encode('utf-8'))
+            if parsed.path.startswith('/sites/'):
+                self._delay(config.web_latency_ms)
+                if rng.random() < config.web_error_rate:
+                    return self._send(503, b'', 'text/html', {'Retry-After': '0'})
+                digest = hashlib.md5(parsed.path.encode('utf-8')).digest()
+                page = corpus[int.from_bytes(digest[:4], 'big') % len(corpus)]
+                validators = {'ETag': f'"{hashlib.md5(page).hexdigest()[:16]}"', 'Last-Modified': STUB_LAST_MODIFIED}
+                if self.headers.get('If-None-Match') == validators['ETag']:
+                    return self._send(304, b'', 'text/html; charset=utf-8', validators)
+                return self._send(200, page, 'text/html; charset=utf-8', validators)
+            self._send(404, b'not found', 'text/plain')
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            self._delay(config.llm_latency_ms)
+            if rng.random() < config.llm_error_rate:
+                error = {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_error', 'code': 429, 'status': 'RESOURCE_EXHAUSTED'}}
+                return self._send(429, json.dumps(error).encode('utf-8'), headers={'Retry-After': '0'})
+
+            if self.path.startswith('/v1/chat/completions'):
+                prompt = payload['messages'][-1]['content']
+                text = _llm_answer(prompt, rng.random() < config.llm_malformed_rate)
+                body = {
+                    'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': int(time.time()),
+                    'model': payload.get('model', 'stub'),
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+                    'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(text) // 4,
+                              'total_tokens': (len(prompt) + len(text)) // 4},
+                }
+                return self._send(200, json.dumps(body).encode('utf-8'))
+            if ':generateContent' in self.path:
+                prompt = ' '.join(part.get('text', '') for content in payload.get('contents', [])
+                                  for part in content.get('parts', []))
+                text = _llm_answer(prompt, rng.random() < config.llm_malformed_rate)
+                body = {
+                    'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'},
+                                    'finishReason': 'STOP', 'index': 0}],
+                    'usageMetadata': {'promptTokenCount': len(prompt) // 4, 'candidatesTokenCount': len(text) // 4,
+                                      'totalTokenCount': (len(prompt) + len(text)) // 4},
+                }
+                return self._send(200, json.dumps(body).encode('utf-8'))
+            self._send(404, b'{}')
+
+    return StubHandler
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+    def handle_error(self, request, client_address):
+        # Clients hang up mid-body on purpose once they have read enough of a page
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def serve(config: StubConfig, port_queue=None, port: int = 0) -> None:
+    server = StubServer(('127.0.0.1', port), make_handler(config, load_corpus(config)))
+    if port_queue is not None:
+        port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+def start_stub_process(config: StubConfig):
+    """Run the stubs in their own process so they neither share the GIL nor inflate the bot's RSS."""
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(config, port_queue), daemon=True)
+    process.start()
+    port = port_queue.get(timeout=30)
+    return process, f"http://127.0.0.1:{port}"
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the stub search/web/LLM server in the foreground')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    print(f"Serving stubs on http://127.0.0.1:{args.port}")
+    serve(StubConfig(), port=args.port)
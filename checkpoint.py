@@ -0,0 +1,36 @@
+import json
+import os
+from typing import Dict, Optional
+
+
+class RunCheckpoint:
+    """Journal next to an output CSV recording how many input rows are safely written.
+
+    `output_bytes` is the size of the output file at the last checkpoint, so a
+    resumed run can drop a half-written trailing row before appending again.
+    """
+
+    def __init__(self, output_file: str):
+        self.path = f"{output_file}.checkpoint.json"
+
+    def load(self) -> Optional[Dict]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, input_file: str, rows_done: int, output_bytes: int, complete: bool = False) -> None:
+        state = {
+            'input_file': os.path.abspath(input_file),
+            'rows_done': rows_done,
+            'output_bytes': output_bytes,
+            'complete': complete,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,105 @@
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable
+
+from domain_resolver import normalize_company_name
+
+
+# Words that describe a company rather than name it ('Slack Technologies' is still 'Slack')
+GENERIC_DESCRIPTORS = {
+    'the', 'technologies', 'technology', 'tech', 'labs', 'lab', 'software', 'systems', 'solutions',
+    'group', 'holdings', 'holding', 'international', 'global', 'services', 'enterprises', 'ventures',
+    'industries', 'partners', 'hq', 'and',
+}
+BLOCK_PREFIX = 3
+# Distinct keys compared against each other inside one block, nearest neighbours in sorted order
+COMPARISON_WINDOW = 50
+# Descriptors are kept when dropping them would leave a core shorter than this ('AB Group')
+MIN_CORE_CHARS = 4
+
+
+def canonical_key(company_name: str) -> str:
+    """Normalized name without trailing descriptors: 'Slack Technologies' -> 'slack'.
+
+    Only a leading 'the' and descriptors at the end are dropped, so names built
+    around a descriptor word ('Tech Data', 'International Paper') keep it.
+    """
+    tokens = normalize_company_name(company_name).split()
+    core = tokens[1:] if tokens[:1] == ['the'] else list(tokens)
+    while core and core[-1] in GENERIC_DESCRIPTORS and len(''.join(core[:-1])) >= MIN_CORE_CHARS:
+        core.pop()
+    return ''.join(core or tokens)
+
+
+class CompanyDeduplicator:
+    """Groups exact and near-duplicate company names so each group is enriched once.
+
+    Names are reduced to a canonical key (legal suffixes and trailing generic
+    descriptors removed), then keys sharing a short prefix block are merged when
+    their similarity ratio reaches `threshold`.
+    """
+
+    def __init__(self, threshold: float = 0.92):
+        self.threshold = threshold
+        self.rows = 0
+        self._group_of_name: Dict[str, str] = {}
+        self._representatives: Dict[str, str] = {}
+        self._parent: Dict[str, str] = {}
+
+    def _find(self, key: str) -> str:
+        root = key
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[key] != root:
+            self._parent[key], key = root, self._parent[key]
+        return root
+
+    def _union(self, a: str, b: str) -> None:
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self._parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def fit(self, company_names: Iterable[str]) -> 'CompanyDeduplicator':
+        spellings = Counter()
+        for name in company_names:
+            spellings[str(name)] += 1
+        self.rows = sum(spellings.values())
+
+        key_of_name = {name: canonical_key(name) for name in spellings}
+        self._parent = {key: key for key in key_of_name.values()}
+
+        blocks = defaultdict(list)
+        for key in self._parent:
+            if len(key) >= 4:
+                blocks[key[:BLOCK_PREFIX]].append(key)
+        for keys in blocks.values():
+            keys.sort()
+            for idx, key in enumerate(keys):
+                for other in keys[idx + 1:idx + 1 + COMPARISON_WINDOW]:
+                    if SequenceMatcher(None, key, other).ratio() >= self.threshold:
+                        self._union(key, other)
+
+        # The most common spelling in each group is the one sent for enrichment
+        best: Dict[str, tuple] = {}
+        for name, count in spellings.items():
+            group = self._find(key_of_name[name])
+            self._group_of_name[name] = group
+            if group not in best or count > best[group][0]:
+                best[group] = (count, name)
+        self._representatives = {group: name for group, (_, name) in best.items()}
+        return self
+
+    def group_of(self, company_name: str) -> str:
+        name = str(company_name)
+        group = self._group_of_name.get(name)
+        return group if group is not None else canonical_key(name)
+
+    def representative(self, group: str) -> str:
+        return self._representatives.get(group, group)
+
+    @property
+    def groups(self) -> int:
+        return len(self._representatives)
+
+    def report(self) -> Dict[str, int]:
+        return {'rows': self.rows, 'groups': self.groups, 'enrichments_saved': self.rows - self.groups}
@@ -0,0 +1,44 @@
+import hashlib
+import re
+from typing import Optional
+
+
+SIMHASH_BITS = 64
+# Share of matching SimHash bits at or above which a page counts as unchanged. On a ~3000-char
+# homepage each edited word flips ~3 of 64 bits and unrelated pages match ~50%, so 0.85 (9 bits)
+# tolerates a date or counter changing but not a rewrite.
+DEFAULT_CHANGE_THRESHOLD = 0.85
+SHINGLE_WORDS = 3
+_WORD = re.compile(r"\w+")
+
+
+def _words(text: str):
+    return _WORD.findall((text or '').lower())
+
+
+def content_hash(text: str) -> str:
+    """Exact fingerprint of cleaned page text, insensitive to case and whitespace."""
+    return hashlib.sha256(' '.join(_words(text)).encode('utf-8')).hexdigest()
+
+
+def simhash(text: str) -> str:
+    """64-bit SimHash over word shingles, as 16 hex digits; similar texts differ in few bits."""
+    words = _words(text)
+    if not words:
+        return ''
+    shingles = [' '.join(words[idx:idx + SHINGLE_WORDS]) for idx in range(max(1, len(words) - SHINGLE_WORDS + 1))]
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    fingerprint = sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+    return f"{fingerprint:016x}"
+
+
+def similarity(a: Optional[str], b: Optional[str]) -> float:
+    """Share of equal bits between two SimHashes (1.0 = same); 0.0 if either is missing."""
+    if not a or not b:
+        return 0.0
+    distance = bin(int(a, 16) ^ int(b, 16)).count('1')
+    return 1.0 - distance / SIMHASH_BITS
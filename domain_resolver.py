@@ -0,0 +1,186 @@
+import csv
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from itertools import groupby
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+
+logger = logging.getLogger(__name__)
+
+# Trailing tokens dropped from company names before building domain guesses
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company',
+    'plc', 'gmbh', 'ag', 'sa', 'sas', 'srl', 'bv', 'nv', 'pty', 'pvt', 'private', 'lp', 'llp',
+    'oy', 'ab', 'as', 'kk', 'spa',
+}
+CANDIDATE_TLDS = ('com', 'io', 'ai', 'co')
+
+
+def normalize_company_name(company_name: str) -> str:
+    """Lowercase ASCII words with punctuation and trailing legal suffixes removed ('Zinc Corp.' -> 'zinc')."""
+    text = unicodedata.normalize('NFKD', str(company_name)).encode('ascii', 'ignore').decode('ascii').lower()
+    text = text.replace('&', ' and ')
+    tokens = []
+    # Rejoin dotted abbreviations such as 'S.A.' or 'B.V.' into one token
+    for single, group in groupby(re.findall(r'[a-z0-9]+', text), key=lambda token: len(token) == 1):
+        tokens.extend([''.join(group)] if single else group)
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return ' '.join(tokens)
+
+
+def candidate_domains(company_name: str, tlds=CANDIDATE_TLDS) -> List[str]:
+    tokens = normalize_company_name(company_name).split()
+    if not tokens:
+        return []
+    stems = [''.join(tokens)]
+    if len(tokens) > 1:
+        stems.append('-'.join(tokens))
+    return [f"{stem}.{tld}" for tld in tlds for stem in stems]
+
+
+class DomainIndex:
+    """JSON file of known company -> website mappings, keyed by normalized name."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, str] = {}
+        self._dirty = 0
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, company_name: str) -> Optional[str]:
+        return self._entries.get(normalize_company_name(company_name))
+
+    def record(self, company_name: str, website: str) -> None:
+        key = normalize_company_name(company_name)
+        if not key:
+            return
+        with self._lock:
+            if self._entries.get(key) == website:
+                return
+            self._entries[key] = website
+            self._dirty += 1
+            dirty = self._dirty
+        # Persist periodically so a crash keeps most of what this run learned
+        if dirty >= 100:
+            self.save()
+
+    def load_csv(self, path: str) -> int:
+        """Seed the index from a previous run's enriched CSV; returns how many rows were usable."""
+        loaded = 0
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                website = (row.get('website') or '').strip()
+                if website.startswith('http') and row.get('company_name'):
+                    self.record(row['company_name'], website)
+                    loaded += 1
+        return loaded
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=0, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = 0
+
+
+class DomainResolver:
+    """Turns a company name (plus an optional search hit) into a website that actually exists.
+
+    Candidate domains are checked with concurrent DNS lookups, then a quick HEAD
+    request, before anything downloads a full page; a name with no live
+    candidate resolves to None in milliseconds instead of two fetch timeouts.
+    """
+
+    def __init__(self, transport=None, index: Optional[DomainIndex] = None,
+                 head_timeout: float = 3.0, resolve_timeout: float = 5.0, max_workers: int = 16):
+        self.transport = transport
+        self.index = index if index is not None else DomainIndex()
+        self.head_timeout = head_timeout
+        self.resolve_timeout = resolve_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='resolve')
+        self._dns_cache: Dict[str, bool] = {}
+
+    def _dns_lookup(self, host: str) -> bool:
+        if host in self._dns_cache:
+            return self._dns_cache[host]
+        try:
+            socket.getaddrinfo(host, None)
+            ok = True
+        except (socket.gaierror, UnicodeError, OSError):
+            ok = False
+        self._dns_cache[host] = ok
+        return ok
+
+    def _alive(self, url: str) -> bool:
+        if self.transport is None:
+            return True
+        try:
+            self.transport.head(url, timeout=self.head_timeout, allow_redirects=True)
+            return True
+        except Exception:
+            return False
+
+    def _check_candidate(self, domain: str) -> Optional[str]:
+        for host in (f"www.{domain}", domain):
+            # A www host that resolves but does not answer can still have a live bare domain
+            if self._dns_lookup(host):
+                url = f"https://{host}"
+                if self._alive(url):
+                    return url
+        return None
+
+    def lookup(self, company_name: str) -> Optional[str]:
+        return self.index.lookup(company_name)
+
+    def resolve(self, company_name: str, search_url: Optional[str] = None) -> Optional[str]:
+        known = self.index.lookup(company_name)
+        if known:
+            return known
+
+        website = None
+        if search_url and self._dns_lookup(urlparse(search_url).hostname or ''):
+            website = search_url
+        else:
+            candidates = candidate_domains(company_name)
+            futures = [self._executor.submit(self._check_candidate, domain) for domain in candidates]
+            deadline = time.monotonic() + self.resolve_timeout
+            # Preference follows candidate order, so a live .com beats a live .io
+            for future in futures:
+                try:
+                    website = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeout:
+                    website = None
+                if website:
+                    break
+            for future in futures:
+                future.cancel()
+
+        if website:
+            self.index.record(company_name, website)
+        else:
+            logger.info(f"No live domain found for {company_name}")
+        return website
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.index.save()
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = '.enrichment_cache.sqlite'
+
+# Seconds each layer stays fresh; websites change faster than search results or paid LLM output
+DEFAULT_TTLS = {
+    'search': 30 * 24 * 3600,
+    'page': 7 * 24 * 3600,
+    'llm': 30 * 24 * 3600,
+}
+
+
+def cache_key(*parts) -> str:
+    """Content-addressed key: a stable hash of whatever identifies the request."""
+    raw = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class EnrichmentCache:
+    """SQLite-backed cache for search results, fetched pages and LLM answers.
+
+    Entries expire per layer after their TTL and the file is kept under
+    `max_bytes` by evicting the least recently used entries first.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 512 * 1024 * 1024,
+                 ttls: Optional[Dict[str, int]] = None, read: bool = True, write: bool = True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.read = read
+        self.write = write
+        self.hits = Counter()
+        self.misses = Counter()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            ' layer TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,'
+            ' size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL,'
+            ' PRIMARY KEY (layer, key))'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)')
+        self._conn.commit()
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+
+    def get(self, layer: str, key: str):
+        if not self.read:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, created_at FROM cache WHERE layer = ? AND key = ?', (layer, key)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttls.get(layer, 0):
+                self.misses[layer] += 1
+                return None
+            self._conn.execute(
+                'UPDATE cache SET accessed_at = ? WHERE layer = ? AND key = ?', (now, layer, key)
+            )
+            self._conn.commit()
+        self.hits[layer] += 1
+        return json.loads(row[0])
+
+    def set(self, layer: str, key: str, value) -> None:
+        if not self.write:
+            return
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute(
+                'SELECT size FROM cache WHERE layer = ? AND key = ?', (layer, key)
+            ).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (layer, key, value, size, created_at, accessed_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?)', (layer, key, payload, size, now, now)
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Drop expired rows first, then least recently used ones until 90% of the budget
+        now = time.time()
+        for layer, ttl in self.ttls.items():
+            self._conn.execute('DELETE FROM cache WHERE layer = ? AND created_at < ?', (layer, now - ttl))
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        while self._total_bytes > target:
+            rows = self._conn.execute(
+                'SELECT layer, key, size FROM cache ORDER BY accessed_at LIMIT 256'
+            ).fetchall()
+            if not rows:
+                break
+            for layer, key, size in rows:
+                self._conn.execute('DELETE FROM cache WHERE layer = ? AND key = ?', (layer, key))
+                self._total_bytes -= size
+                evicted += 1
+                if self._total_bytes <= target:
+                    break
+        if evicted:
+            logger.debug(f"Cache evicted {evicted} least recently used entries")
+
+    def clear(self, layer: Optional[str] = None) -> None:
+        with self._lock:
+            if layer:
+                self._conn.execute('DELETE FROM cache WHERE layer = ?', (layer,))
+            else:
+                self._conn.execute('DELETE FROM cache')
+            self._conn.commit()
+            self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        layers = set(self.hits) | set(self.misses)
+        return {layer: {'hits': self.hits[layer], 'misses': self.misses[layer]} for layer in sorted(layers)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
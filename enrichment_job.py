@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from result_table import ResultTable
+
+
+logger = logging.getLogger(__name__)
+
+
+class EnrichmentJob:
+    """Enriches a list of companies on a background thread while a UI polls its progress.
+
+    Finished rows accumulate in input order in a ResultTable and can be read
+    at any time with `rows()` or `to_frame()`; `cancel()` stops the job after
+    the companies already in flight.
+    """
+
+    def __init__(self, bot, company_names: List[str], workers: int = 4, batch_size: int = 1,
+                 key: Optional[str] = None):
+        self.bot = bot
+        self.company_names = [str(name) for name in company_names]
+        self.workers = workers
+        self.batch_size = batch_size
+        # Identifies the input the job was started for, so a rerun can tell whether it is still current
+        self.key = key
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._rows = ResultTable(bot.output_columns)
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='enrichment-job', daemon=True)
+
+    def start(self) -> 'EnrichmentJob':
+        self.started_at = time.time()
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        try:
+            for _, row in self.bot.enrich_many(self.company_names, self.workers, self.batch_size):
+                with self._lock:
+                    self._rows.append(row)
+                if self._cancelled.is_set():
+                    break
+        except Exception as e:
+            logger.error(f"Enrichment job failed: {e}")
+            self.error = str(e)
+        finally:
+            self.finished_at = time.time()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    @property
+    def total(self) -> int:
+        return len(self.company_names)
+
+    @property
+    def done(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+    def rows(self) -> List[Dict[str, str]]:
+        with self._lock:
+            return list(self._rows.iter_rows())
+
+    def to_frame(self):
+        with self._lock:
+            return self._rows.to_frame()
+
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed()
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self) -> Optional[float]:
+        """Seconds until the remaining companies finish at the current rate, or None before the first row."""
+        rate = self.rows_per_second()
+        if not self.running:
+            return 0.0
+        if rate <= 0:
+            return None
+        return (self.total - self.done) / rate
@@ -0,0 +1,110 @@
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NameResolutionError
+
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header given either as delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def jittered_backoff(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """Exponential backoff with full jitter, unless the server said how long to wait."""
+    if retry_after is not None:
+        return min(retry_after, cap)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def is_dns_failure(error: Exception) -> bool:
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NameResolutionError)
+
+
+class HttpTransport:
+    """One pooled keep-alive session shared by every fetch path, with retries on 429/5xx.
+
+    Backoff is exponential with full jitter, capped at `max_backoff`; a server's
+    Retry-After header takes precedence when present.
+    """
+
+    def __init__(self, pool_connections: int = 20, pool_maxsize: int = 20, max_retries: int = 3,
+                 backoff_base: float = 0.5, max_backoff: float = 30.0,
+                 headers: Optional[Dict[str, str]] = None, rate_limits=None):
+        self.max_retries = max_retries
+        # Optional RateLimiterRegistry keyed by host; 429s tighten that host's rate, successes loosen it
+        self.rate_limits = rate_limits
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @property
+    def headers(self):
+        return self.session.headers
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        return jittered_backoff(attempt, self.backoff_base, self.max_backoff, retry_after)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        limiter = self.rate_limits.get(urlparse(url).netloc) if self.rate_limits is not None else None
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # A domain that does not resolve will not resolve on retry either
+                if attempt >= self.max_retries or is_dns_failure(e):
+                    raise
+                delay = self.backoff(attempt)
+                logger.debug(f"{type(e).__name__} for {url}; retry {attempt + 1} in {delay:.2f}s")
+            else:
+                if limiter is not None:
+                    if response.status_code == 429:
+                        limiter.record_throttled()
+                    elif response.status_code < 500:
+                        limiter.record_success()
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = self.backoff(attempt, parse_retry_after(response.headers.get('Retry-After')))
+                logger.debug(f"HTTP {response.status_code} for {url}; retry {attempt + 1} in {delay:.2f}s")
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        """Single cheap liveness probe; no retries, any HTTP answer counts as alive."""
+        response = self.session.head(url, **kwargs)
+        response.close()
+        return response
+
+    def close(self) -> None:
+        self.session.close()
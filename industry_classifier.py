@@ -0,0 +1,70 @@
+import json
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+
+DEFAULT_TAXONOMY = {
+    'Technology': ['software', 'tech', 'ai', 'artificial intelligence', 'machine learning', 'saas', 'platform', 'app', 'digital'],
+    'Healthcare': ['health', 'medical', 'healthcare', 'hospital', 'clinic', 'pharma', 'medicine'],
+    'Finance': ['finance', 'banking', 'investment', 'fintech', 'financial', 'trading', 'payments'],
+    'E-commerce': ['ecommerce', 'e-commerce', 'retail', 'shopping', 'marketplace', 'store'],
+    'Education': ['education', 'learning', 'training', 'school', 'university', 'course'],
+    'Manufacturing': ['manufacturing', 'production', 'factory', 'industrial', 'automotive'],
+    'Real Estate': ['real estate', 'property', 'housing', 'construction', 'building'],
+    'Marketing': ['marketing', 'advertising', 'agency', 'brand', 'campaign', 'social media'],
+}
+
+
+class IndustryClassifier:
+    """Keyword classifier compiled into a single word-boundary regex.
+
+    One `finditer` pass counts hits for every industry at once; keywords only
+    match whole words (optionally pluralised), so 'app' no longer fires on
+    'happy'. Ties go to the industry listed first in the taxonomy.
+    """
+
+    def __init__(self, taxonomy: Dict[str, List[str]] = None):
+        self.taxonomy = taxonomy or DEFAULT_TAXONOMY
+        self.industries = list(self.taxonomy)
+        groups = []
+        for idx, industry in enumerate(self.industries):
+            # Longest first so multi-word phrases win over their own prefixes
+            keywords = sorted({k.strip().lower() for k in self.taxonomy[industry] if k.strip()}, key=len, reverse=True)
+            if keywords:
+                alternatives = '|'.join(re.escape(k).replace(r'\ ', r'\s+') for k in keywords)
+                groups.append(f"(?P<i{idx}>{alternatives})")
+        self._pattern = re.compile(r"\b(?:" + '|'.join(groups) + r")(?:s|es)?\b", re.IGNORECASE) if groups else None
+
+    @classmethod
+    def from_file(cls, path: str) -> 'IndustryClassifier':
+        """Load a taxonomy from a JSON file shaped like {"Industry": ["keyword", ...]}."""
+        with open(path, 'r', encoding='utf-8') as f:
+            taxonomy = json.load(f)
+        if not isinstance(taxonomy, dict) or not all(isinstance(v, list) for v in taxonomy.values()):
+            raise ValueError(f"{path} must map industry names to keyword lists")
+        return cls(taxonomy)
+
+    def scores(self, text: str) -> Counter:
+        hits = Counter()
+        if self._pattern is None or not text:
+            return hits
+        for match in self._pattern.finditer(text):
+            hits[self.industries[int(match.lastgroup[1:])]] += 1
+        return hits
+
+    def rank(self, text: str) -> List[Tuple[str, int]]:
+        hits = self.scores(text)
+        return sorted(hits.items(), key=lambda item: (-item[1], self.industries.index(item[0])))
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        """Return (industry, confidence) where confidence is the winner's share of all keyword hits."""
+        ranked = self.rank(text)
+        if not ranked:
+            return 'Unknown', 0.0
+        total = sum(count for _, count in ranked)
+        industry, count = ranked[0]
+        return industry, round(count / total, 3)
+
+    def classify_many(self, texts: Iterable[str]) -> List[Tuple[str, float]]:
+        return [self.classify(text) for text in texts]
@@ -1,102 +1,317 @@
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import openai
-import google.generativeai as genai
 import time
+import csv
 import json
 import re
+import sys
 from urllib.parse import urljoin, urlparse
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 import os
-from dataclasses import dataclass
+import threading
+from collections import Counter, defaultdict, deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+from checkpoint import RunCheckpoint
+from http_transport import HttpTransport
+from company_dedup import CompanyDeduplicator
+from content_fingerprint import DEFAULT_CHANGE_THRESHOLD, content_hash, similarity, simhash
+from domain_resolver import DomainIndex, DomainResolver
+from enrichment_cache import DEFAULT_CACHE_PATH, EnrichmentCache, cache_key
+from industry_classifier import IndustryClassifier
+from lead_priority import DEFAULT_PRIORITY_WINDOW, QUALIFIED, SKIP_UNCHANGED, LeadPolicy
+from lead_store import CHANGE_COLUMNS, ColumnarWriter, LeadStore, columnar_format, iter_columnar_companies, open_lead_store
+from llm_batch import build_batch_prompt, parse_batch_response
+from llm_router import LLMRouter
+from parse_pool import ParsePool
+from prompt_context import DEFAULT_TOKEN_BUDGET, build_context, estimate_tokens
+from result_table import ResultTable
+from run_metrics import RunMetrics
+from structured_output import (JSON_RESPONSE_INSTRUCTIONS, AnalysisValidationError, build_reask_prompt,
+                               parse_analysis, parse_success_report, salvage_analysis)
+from throttling import KeyedSemaphore, RateLimiterRegistry
+from web_page import MAX_PAGE_BYTES, HtmlTextExtractor, WebPage, charset_from_content_type
+from work_queue import DEFAULT_ITEM_SIZE, DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, WorkItem, WorkQueue
+
+# pandas and the provider SDKs take over a second to import, so they are imported where first used
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Starting quotas per LLM provider; AIMD moves them at runtime based on 429s
+DEFAULT_PROVIDER_RATES = {
+    'gemini': {'requests_per_minute': 60, 'tokens_per_minute': 1000000},
+    'openai': {'requests_per_minute': 500, 'tokens_per_minute': 200000},
+}
+DEFAULT_DOMAIN_RPM = 60
+DEFAULT_SEARCH_API_URL = 'https://api.duckduckgo.com/'
+# The search API is hit once per company, so it gets a far larger share than any single website
+DEFAULT_DOMAIN_RATES = {'api.duckduckgo.com': {'requests_per_minute': 300}}
+
+UNCACHED_PAGE_FIELDS = {'content', 'industry', 'industry_confidence'}
+
+OUTPUT_COLUMNS = ['company_name', 'website', 'industry', 'summary_from_llm', 'automation_pitch_from_llm']
+# Written instead of a summary when no provider produced an analysis
+FAILED_SUMMARY = "Unable to generate summary"
+FAILED_PITCH = "Custom AI automation solution available"
+
+# dataclass(slots=True) needs Python 3.10; older interpreters get a plain dataclass
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**DATACLASS_SLOTS)
 class CompanyData:
     name: str
     website: str = ""
     industry: str = ""
+    industry_confidence: float = 0.0
     company_size: str = ""
     location: str = ""
     summary: str = ""
     automation_pitch: str = ""
+    lead_score: Optional[float] = None
+    lead_tier: str = ""
+    # Fingerprints of the homepage text the summary was written from, and the page's HTTP validators
+    content_hash: str = ""
+    content_simhash: str = ""
+    etag: str = ""
+    last_modified: str = ""
+    content_unchanged: bool = False
+    # True only when summary and pitch are a provider's answer, not the no-key template or the failure text
+    llm_analyzed: bool = False
+    # Wall time of the cheap stage, so split pipelines can report whole-row latency like _enrich_row
+    collect_seconds: float = 0.0
+    timings: Dict[str, float] = field(default_factory=dict)
 
 class LeadEnrichmentBot:
-    def __init__(self, openai_api_key: str = None, gemini_api_key: str = None):
+    def __init__(self, openai_api_key: str = None, gemini_api_key: str = None, openai_api_base: str = None,
+                 max_per_host: int = 2, max_per_provider: int = 4,
+                 cache: Optional[EnrichmentCache] = None, transport: Optional[HttpTransport] = None,
+                 provider_rates: Optional[Dict[str, Dict[str, float]]] = None,
+                 domain_rpm: float = DEFAULT_DOMAIN_RPM, timing_column: bool = False,
+                 search_api_url: str = DEFAULT_SEARCH_API_URL, gemini_api_endpoint: str = None,
+                 max_page_bytes: int = MAX_PAGE_BYTES, industry_classifier: Optional[IndustryClassifier] = None,
+                 domain_resolver: Optional[DomainResolver] = None, llm_router: Optional[LLMRouter] = None,
+                 json_mode: bool = True, max_reasks: int = 1, parse_pool: Optional[ParsePool] = None,
+                 prompt_token_budget: int = DEFAULT_TOKEN_BUDGET, lead_policy: Optional[LeadPolicy] = None,
+                 priority_window: int = DEFAULT_PRIORITY_WINDOW):
         self.openai_api_key = openai_api_key
         self.gemini_api_key = gemini_api_key
+        self.host_limits = KeyedSemaphore(max_per_host)
+        self.provider_limits = KeyedSemaphore(max_per_provider)
+        self.cache = cache
+        self.metrics = RunMetrics()
+        self.timing_column = timing_column
+        # With a lead policy, only qualifying leads reach the LLM, best first within each window of rows
+        self.lead_policy = lead_policy
+        self.priority_window = priority_window
+        # Set while refreshing a lead store: homepages unchanged since their stored row skip the LLM
+        self.previous_results: Optional[LeadStore] = None
+        self.change_threshold = DEFAULT_CHANGE_THRESHOLD
+        self.search_api_url = search_api_url
+        self.gemini_api_endpoint = gemini_api_endpoint
+        # Ask providers for a JSON object natively (OpenAI response_format / Gemini response_mime_type)
+        self.json_mode = json_mode
+        self.max_reasks = max_reasks
+        self.max_page_bytes = max_page_bytes
+        self.industry_classifier = industry_classifier or IndustryClassifier()
+        self.parse_pool = parse_pool
+        # Website content per prompt is cut to the most relevant passages within this many tokens
+        self.prompt_token_budget = prompt_token_budget
+        self.openai_model_name = 'gpt-3.5-turbo'
+        self.gemini_model_name = 'gemini-1.5-flash'
         
+        if openai_api_key or openai_api_base:
+            import openai
         if openai_api_key:
             openai.api_key = openai_api_key
+        if openai_api_base:
+            openai.api_base = openai_api_base
         
         if gemini_api_key:
-            genai.configure(api_key=gemini_api_key)
-            self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+            import google.generativeai as genai
+            if gemini_api_endpoint:
+                genai.configure(api_key=gemini_api_key, transport='rest',
+                                client_options={'api_endpoint': gemini_api_endpoint})
+            else:
+                genai.configure(api_key=gemini_api_key)
+            self.gemini_model = genai.GenerativeModel(self.gemini_model_name)
         
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        self.provider_rates = RateLimiterRegistry(60, overrides=dict(DEFAULT_PROVIDER_RATES, **(provider_rates or {})))
+        self.domain_rates = RateLimiterRegistry(domain_rpm, overrides=DEFAULT_DOMAIN_RATES)
+        self.transport = transport or HttpTransport()
+        if self.transport.rate_limits is None:
+            self.transport.rate_limits = self.domain_rates
+        self.headers = self.transport.headers
+        self.domain_resolver = domain_resolver or DomainResolver(self.transport)
+        # Gemini stays first by default, as before; the router hedges and fails over to the other provider
+        providers = [provider for provider, key in (('gemini', gemini_api_key), ('openai', openai_api_key)) if key]
+        self.llm_router = llm_router or LLMRouter(providers)
+        if self.llm_router.metrics is None:
+            self.llm_router.metrics = self.metrics
+    
+    def _cache_get(self, layer: str, *key_parts):
+        if self.cache is None:
+            return None
+        return self.cache.get(layer, cache_key(*key_parts))
+    
+    def _cache_set(self, layer: str, value, *key_parts) -> None:
+        if self.cache is not None:
+            self.cache.set(layer, cache_key(*key_parts), value)
+    
+    def _search_url(self, company_name: str) -> str:
+        return f"{self.search_api_url}?q={company_name}&format=json&no_redirect=1"
+    
+    def _website_from_search(self, company_name: str, data: Dict) -> Optional[str]:
+        if 'Answer' in data and data['Answer']:
+            urls = re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', data['Answer'])
+            if urls:
+                return urls[0]
+        
+        if 'RelatedTopics' in data:
+            for topic in data['RelatedTopics']:
+                if isinstance(topic, dict) and 'FirstURL' in topic:
+                    url = topic['FirstURL']
+                    if company_name.lower().replace(' ', '') in url.lower():
+                        return url
+        
+        return None
+    
+    def _lookup_company_website(self, company_name: str) -> Optional[str]:
+        with self.host_limits.hold(urlparse(self.search_api_url).netloc):
+            response = self.transport.get(self._search_url(company_name), timeout=10)
+        
+        if response.status_code == 200:
+            return self._website_from_search(company_name, response.json())
+        return None
     
     def search_company_website(self, company_name: str) -> str:
+        cached = self._cache_get('search', company_name)
+        if cached:
+            return cached
+        
+        known = self.domain_resolver.lookup(company_name)
+        if known:
+            self.metrics.increment('domain_index_hits')
+            return known
+        
+        found = None
         try:
-            search_url = f"https://api.duckduckgo.com/?q={company_name}&format=json&no_redirect=1"
-            response = requests.get(search_url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if 'Answer' in data and data['Answer']:
-                    urls = re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', data['Answer'])
-                    if urls:
-                        return urls[0]
-                
-                if 'RelatedTopics' in data:
-                    for topic in data['RelatedTopics']:
-                        if isinstance(topic, dict) and 'FirstURL' in topic:
-                            url = topic['FirstURL']
-                            if company_name.lower().replace(' ', '') in url.lower():
-                                return url
-            
-            company_clean = company_name.lower().replace(' ', '').replace('inc', '').replace('llc', '').replace('ltd', '')
-            return f"https://www.{company_clean}.com"
-            
+            with self.metrics.timer('search'):
+                found = self._lookup_company_website(company_name)
         except Exception as e:
+            self.metrics.record_error('search', e)
             logger.warning(f"Error searching for {company_name} website: {e}")
-            company_clean = company_name.lower().replace(' ', '').replace('inc', '').replace('llc', '').replace('ltd', '')
-            return f"https://www.{company_clean}.com"
+        
+        # Verify the search hit, or the best live domain guess, before anything downloads a page
+        with self.metrics.timer('resolve'):
+            website = self.domain_resolver.resolve(company_name, found)
+        if not website:
+            self.metrics.increment('unresolved_domains')
+            return 'Unknown'
+        
+        self._cache_set('search', website, company_name)
+        return website
+    
+    def fetch_page(self, url: str, validators: Optional[Dict[str, str]] = None) -> WebPage:
+        """Fetch and parse a homepage; with `validators` (etag / last_modified) the server may answer 304."""
+        cached = self._cached_page(url)
+        if cached:
+            return cached
+        
+        page = WebPage(url=url, final_url=url)
+        conditional = {}
+        if validators and validators.get('etag'):
+            conditional['If-None-Match'] = validators['etag']
+        if validators and validators.get('last_modified'):
+            conditional['If-Modified-Since'] = validators['last_modified']
+        try:
+            with self.host_limits.hold(urlparse(url).netloc):
+                started = time.perf_counter()
+                response = self.transport.get(url, timeout=15, stream=True, headers=conditional or None)
+                page.status_code = response.status_code
+                page.final_url = response.url or url
+                page.etag = response.headers.get('ETag', '')
+                page.last_modified = response.headers.get('Last-Modified', '')
+                parse_seconds = 0.0
+                encoding = charset_from_content_type(response.headers.get('Content-Type'))
+                if response.status_code == 200 and self.parse_pool is not None:
+                    # Only download here; parsing happens in a worker process once the host slot is free
+                    received = bytearray()
+                    for chunk in response.iter_content(chunk_size=16384):
+                        received += chunk
+                        if len(received) >= self.max_page_bytes:
+                            page.truncated = True
+                            break
+                    page.content = bytes(received)
+                elif response.status_code == 200:
+                    # Download and parse together, stopping as soon as the extractor has enough text
+                    extractor = HtmlTextExtractor(encoding=encoding)
+                    received = bytearray()
+                    for chunk in response.iter_content(chunk_size=16384):
+                        received += chunk
+                        parse_started = time.perf_counter()
+                        enough = extractor.feed(chunk)
+                        parse_seconds += time.perf_counter() - parse_started
+                        if enough or len(received) >= self.max_page_bytes:
+                            page.truncated = True
+                            break
+                    page.content = bytes(received)
+                    parse_started = time.perf_counter()
+                    page.meta_description, page.text = extractor.result()
+                    parse_seconds += time.perf_counter() - parse_started
+                response.close()
+            if page.content and self.parse_pool is not None:
+                parse_started = time.perf_counter()
+                page.meta_description, page.text, page.industry, page.industry_confidence = \
+                    self.parse_pool.parse(page.content, encoding)
+                parse_seconds = time.perf_counter() - parse_started
+            self._record_page(page, time.perf_counter() - started - parse_seconds, parse_seconds)
+        except Exception as e:
+            self.metrics.record_error('fetch', e)
+            logger.warning(f"Error fetching {url}: {e}")
+        return page
+    
+    def _cached_page(self, url: str) -> Optional[WebPage]:
+        cached = self._cache_get('page', url)
+        return WebPage(**cached) if cached else None
     
-    def get_company_basic_info(self, company_name: str) -> Dict[str, str]:
+    def _record_page(self, page: WebPage, fetch_seconds: float, parse_seconds: float) -> None:
+        self.metrics.observe('fetch', fetch_seconds)
+        self.metrics.increment('pages_fetched')
+        self.metrics.increment('bytes_downloaded', len(page.content))
+        if page.not_modified:
+            self.metrics.increment('pages_not_modified')
+        if page.ok:
+            self.metrics.observe('parse', parse_seconds)
+            # Raw bytes stay out of the cache; every consumer works from the parsed fields. The
+            # industry is left out too so a cached page is always scored with the current taxonomy.
+            self._cache_set('page', {k: v for k, v in asdict(page).items() if k not in UNCACHED_PAGE_FIELDS}, page.url)
+    
+    def get_company_basic_info(self, company_name: str) -> Dict[str, object]:
         try:
             website = self.search_company_website(company_name)
-            try:
-                response = requests.get(website, headers=self.headers, timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    meta_desc = soup.find('meta', attrs={'name': 'description'})
-                    description = meta_desc.get('content', '') if meta_desc else ''
-                    
-                    industry = self.infer_industry_from_content(description + ' ' + soup.get_text()[:1000])
-                    
-                    return {
-                        'website': website,
-                        'industry': industry,
-                        'company_size': 'Unknown',
-                        'location': 'Unknown'
-                    }
-            except:
-                pass
+            previous = self.previous_results.previous(company_name) if self.previous_results is not None else None
+            # Validators only apply to the page the stored summary came from, and are only stored with LLM summaries
+            validators = previous if previous and previous.get('website') == website and self._has_fingerprint(previous) else None
+            page = self.fetch_page(website, validators) if website != 'Unknown' else None
+            
+            if page is not None and page.not_modified and validators:
+                industry, confidence = validators.get('industry') or 'Unknown', 0.0
+            else:
+                industry, confidence = self._page_industry(page)
             
             return {
                 'website': website,
-                'industry': 'Unknown',
+                'industry': industry,
+                'industry_confidence': confidence,
                 'company_size': 'Unknown',
-                'location': 'Unknown'
+                'location': 'Unknown',
+                'page': page,
+                'previous': validators
             }
             
         except Exception as e:
@@ -105,237 +320,1137 @@ class LeadEnrichmentBot:
                 'website': 'Unknown',
                 'industry': 'Unknown',
                 'company_size': 'Unknown',
-                'location': 'Unknown'
+                'location': 'Unknown',
+                'page': None
             }
     
+    def _page_industry(self, page: Optional[WebPage]) -> Tuple[str, float]:
+        if page is None or not page.ok:
+            return 'Unknown', 0.0
+        if page.industry:
+            # Already scored in the parse pool
+            return page.industry, page.industry_confidence
+        with self.metrics.timer('industry'):
+            return self.classify_industry(page.meta_description + ' ' + page.text[:1000])
+    
+    def classify_industry(self, content: str) -> Tuple[str, float]:
+        return self.industry_classifier.classify(content)
+    
     def infer_industry_from_content(self, content: str) -> str:
-        content_lower = content.lower()
-        
-        industry_keywords = {
-            'Technology': ['software', 'tech', 'ai', 'artificial intelligence', 'machine learning', 'saas', 'platform', 'app', 'digital'],
-            'Healthcare': ['health', 'medical', 'healthcare', 'hospital', 'clinic', 'pharma', 'medicine'],
-            'Finance': ['finance', 'banking', 'investment', 'fintech', 'financial', 'trading', 'payments'],
-            'E-commerce': ['ecommerce', 'e-commerce', 'retail', 'shopping', 'marketplace', 'store'],
-            'Education': ['education', 'learning', 'training', 'school', 'university', 'course'],
-            'Manufacturing': ['manufacturing', 'production', 'factory', 'industrial', 'automotive'],
-            'Real Estate': ['real estate', 'property', 'housing', 'construction', 'building'],
-            'Marketing': ['marketing', 'advertising', 'agency', 'brand', 'campaign', 'social media'],
-        }
-        
-        for industry, keywords in industry_keywords.items():
-            if any(keyword in content_lower for keyword in keywords):
-                return industry
+        return self.classify_industry(content)[0]
+    
+    def scrape_website_content(self, url: str, page: Optional[WebPage] = None) -> str:
+        if page is None or page.url != url:
+            page = self.fetch_page(url)
+        return page.text if page.ok else ""
         
-        return 'Unknown'
+    def _llm_provider(self) -> Optional[str]:
+        return self.llm_router.primary()
+    
+    def _model_name(self, provider: str) -> str:
+        return self.gemini_model_name if provider == 'gemini' else self.openai_model_name
     
-    def scrape_website_content(self, url: str) -> str:
+    def _is_rate_limited(self, error: Exception) -> bool:
+        # openai.error.RateLimitError / google.api_core.exceptions.ResourceExhausted, without importing either
+        return type(error).__name__ in ('RateLimitError', 'ResourceExhausted', 'TooManyRequests') or '429' in str(error)
+    
+    def _complete(self, provider: str, prompt: str, max_tokens: int = 300, json_output: bool = False,
+                  batch: bool = False) -> str:
+        limiter = self.provider_rates.get(provider)
+        # Rough estimate of prompt tokens plus the completion budget
+        with self.metrics.timer('rate_limit_wait'):
+            limiter.acquire(tokens=len(prompt) // 4 + max_tokens)
         try:
-            response = requests.get(url, headers=self.headers, timeout=15)
-            if response.status_code != 200:
-                return ""
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            for element in soup(["script", "style", "nav", "footer", "header"]):
-                element.decompose()
-            
-            text = soup.get_text()
-            
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
-            
-            return text[:3000]
-            
+            with self.metrics.timer('llm'), self.provider_limits.hold(provider):
+                started = time.perf_counter()
+                if provider == 'gemini':
+                    response = self.gemini_model.generate_content(prompt, **self._gemini_options(json_output))
+                else:
+                    import openai
+                    response = openai.ChatCompletion.create(**self._openai_request(prompt, max_tokens, json_output))
+                seconds = time.perf_counter() - started
         except Exception as e:
-            logger.warning(f"Error scraping {url}: {e}")
-            return ""
-        
-    #WITH OPENAI
-    def analyze_with_openai(self, company_name: str, website_content: str, industry: str) -> Tuple[str, str]:
-        try:
-            prompt = f"""
+            self._record_llm_failure(provider, limiter, e)
+            raise
+        # A batch call takes several times longer than a single one; keep it out of the hedge delay
+        return self._record_llm_success(provider, limiter, prompt, response, None if batch else seconds)
+    
+    def _openai_request(self, prompt: str, max_tokens: int, json_output: bool = False) -> Dict[str, object]:
+        request = {
+            'model': self.openai_model_name,
+            'messages': [{"role": "user", "content": prompt}],
+            'max_tokens': max_tokens,
+            'temperature': 0.7,
+        }
+        if json_output and self.json_mode:
+            request['response_format'] = {'type': 'json_object'}
+        return request
+    
+    def _gemini_options(self, json_output: bool = False) -> Dict[str, object]:
+        if json_output and self.json_mode:
+            return {'generation_config': {'response_mime_type': 'application/json'}}
+        return {}
+    
+    def _record_llm_failure(self, provider: str, limiter, error: Exception) -> None:
+        self.metrics.record_error('llm', error)
+        self.llm_router.record(provider, None, False)
+        if self._is_rate_limited(error):
+            limiter.record_throttled()
+            logger.warning(f"{provider} rate limited; now {limiter.snapshot()['requests_per_minute']} requests/min")
+    
+    def _record_llm_success(self, provider: str, limiter, prompt: str, response, seconds: Optional[float]) -> str:
+        """Extract the completion text and book its token usage and request latency."""
+        if provider == 'gemini':
+            content = response.text
+            usage = getattr(response, 'usage_metadata', None)
+            tokens_in = getattr(usage, 'prompt_token_count', None)
+            tokens_out = getattr(usage, 'candidates_token_count', None)
+        else:
+            content = response.choices[0].message.content
+            usage = response.get('usage') or {}
+            tokens_in = usage.get('prompt_tokens')
+            tokens_out = usage.get('completion_tokens')
+        limiter.record_success()
+        self.llm_router.record(provider, seconds, True)
+        self.metrics.increment(f'llm_calls_{provider}')
+        self.metrics.increment('tokens_sent', tokens_in or len(prompt) // 4)
+        self.metrics.increment('tokens_received', tokens_out or len(content) // 4)
+        return content
+    
+    def metrics_report(self, fmt: str = 'json') -> str:
+        """Run profile: per-stage latency histograms, bytes, tokens, cache hits and errors."""
+        cache_stats = self.cache.stats() if self.cache is not None else None
+        providers = self.llm_router.snapshot()
+        if fmt == 'prometheus':
+            return self.metrics.to_prometheus(cache_stats, providers)
+        return self.metrics.to_json(cache_stats, providers)
+    
+    def rate_snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Current adaptive rates for every LLM provider and every domain contacted so far."""
+        return {'providers': self.provider_rates.snapshot(), 'domains': self.domain_rates.snapshot()}
+    
+    def _prompt_context(self, website_content: str) -> str:
+        """Relevance-ranked passages of the page that fit the prompt token budget."""
+        context = build_context(website_content, self.prompt_token_budget)
+        kept = estimate_tokens(context)
+        self.metrics.increment('context_tokens_kept', kept)
+        self.metrics.increment('context_tokens_trimmed', max(0, estimate_tokens(website_content) - kept))
+        return context
+    
+    def openai_prompt(self, company_name: str, website_content: str, industry: str) -> str:
+        return f"""
             Analyze the following company information:
             
             Company: {company_name}
             Industry: {industry}
-            Website Content: {website_content[:2000]}
+            Website Content: {self._prompt_context(website_content)}
             
             Please provide:
-            1. A concise summary (2-3 sentences) of what this company does
-            2. A custom AI automation pitch (2-3 sentences) that QF Innovate could offer them
+            1. "summary": A concise summary (2-3 sentences) of what this company does
+            2. "pitch": A custom AI automation pitch (2-3 sentences) that QF Innovate could offer them
             
-            Format your response as:
-            SUMMARY: [your summary here]
-            PITCH: [your automation pitch here]
+            {JSON_RESPONSE_INSTRUCTIONS}
             """
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=300,
-                temperature=0.7
-            )
-            
-            content = response.choices[0].message.content
-            
-            summary = ""
-            pitch = ""
-            
-            if "SUMMARY:" in content and "PITCH:" in content:
-                parts = content.split("PITCH:")
-                summary = parts[0].replace("SUMMARY:", "").strip()
-                pitch = parts[1].strip()
-            else:
-                summary = content[:150]
-                pitch = "Custom AI automation solution tailored to your business needs."
-            
-            return summary, pitch
-            
+    
+    def parse_openai_response(self, content: str) -> Tuple[str, str]:
+        summary = ""
+        pitch = ""
+        
+        if "SUMMARY:" in content and "PITCH:" in content:
+            parts = content.split("PITCH:")
+            summary = parts[0].replace("SUMMARY:", "").strip()
+            pitch = parts[1].strip()
+        else:
+            summary = content[:150]
+            pitch = "Custom AI automation solution tailored to your business needs."
+        return summary, pitch
+    
+    #WITH OPENAI
+    def analyze_with_openai(self, company_name: str, website_content: str, industry: str) -> Tuple[str, str]:
+        try:
+            return self._analyze_attempt('openai', company_name, website_content, industry)[:2]
         except Exception as e:
             logger.error(f"OpenAI API error for {company_name}: {e}")
-            return "Unable to generate summary", "Custom AI automation solution available"
+            return FAILED_SUMMARY, FAILED_PITCH
         
 
-    #WITH GEMINI
-    def analyze_with_gemini(self, company_name: str, website_content: str, industry: str) -> Tuple[str, str]:
-        try:
-            prompt = f"""
+    def gemini_prompt(self, company_name: str, website_content: str, industry: str) -> str:
+        return f"""
             Analyze this company and provide insights:
             
             Company: {company_name}
             Industry: {industry}
-            Website Content: {website_content[:2000]}
+            Website Content: {self._prompt_context(website_content)}
             
             Please provide:
-            1. SUMMARY: A concise 2-3 sentence summary of what this company does
-            2. PITCH: A 2-3 sentence custom AI automation pitch that QF Innovate could offer them
+            1. "summary": A concise 2-3 sentence summary of what this company does
+            2. "pitch": A 2-3 sentence custom AI automation pitch that QF Innovate could offer them
             
             Keep responses professional and focused on business value.
+            {JSON_RESPONSE_INSTRUCTIONS}
             """
-            
-            response = self.gemini_model.generate_content(prompt)
-            content = response.text
-            
-            summary = ""
-            pitch = ""
-            
-            if "SUMMARY:" in content and "PITCH:" in content:
-                parts = content.split("PITCH:")
-                summary = parts[0].replace("SUMMARY:", "").strip()
-                pitch = parts[1].strip()
-            elif "1." in content and "2." in content:
-                lines = content.split('\n')
-                for i, line in enumerate(lines):
-                    if '1.' in line or 'SUMMARY' in line.upper():
-                        summary = line.replace('1.', '').replace('SUMMARY:', '').strip()
-                    elif '2.' in line or 'PITCH' in line.upper():
-                        pitch = line.replace('2.', '').replace('PITCH:', '').strip()
-            else:
-                summary = content[:150]
-                pitch = "Custom AI automation solution tailored to optimize your business processes."
-            
-            return summary, pitch
-            
+    
+    def parse_gemini_response(self, content: str) -> Tuple[str, str]:
+        summary = ""
+        pitch = ""
+        
+        if "SUMMARY:" in content and "PITCH:" in content:
+            parts = content.split("PITCH:")
+            summary = parts[0].replace("SUMMARY:", "").strip()
+            pitch = parts[1].strip()
+        elif "1." in content and "2." in content:
+            lines = content.split('\n')
+            for i, line in enumerate(lines):
+                if '1.' in line or 'SUMMARY' in line.upper():
+                    summary = line.replace('1.', '').replace('SUMMARY:', '').strip()
+                elif '2.' in line or 'PITCH' in line.upper():
+                    pitch = line.replace('2.', '').replace('PITCH:', '').strip()
+        else:
+            summary = content[:150]
+            pitch = "Custom AI automation solution tailored to optimize your business processes."
+        return summary, pitch
+    
+    #WITH GEMINI
+    def analyze_with_gemini(self, company_name: str, website_content: str, industry: str) -> Tuple[str, str]:
+        try:
+            return self._analyze_attempt('gemini', company_name, website_content, industry)[:2]
         except Exception as e:
             logger.error(f"Gemini API error for {company_name}: {e}")
-            return "Unable to generate summary", "Custom AI automation solution available"
+            return FAILED_SUMMARY, FAILED_PITCH
     
-    def enrich_company(self, company_name: str) -> CompanyData:
+    def _analysis_prompt(self, provider: str, company_name: str, website_content: str, industry: str) -> str:
+        if provider == 'gemini':
+            return self.gemini_prompt(company_name, website_content, industry)
+        return self.openai_prompt(company_name, website_content, industry)
+    
+    def _parse_analysis(self, provider: str, content: str) -> Tuple[str, str]:
+        if provider == 'gemini':
+            return self.parse_gemini_response(content)
+        return self.parse_openai_response(content)
+    
+    def _analyze_attempt(self, provider: str, company_name: str, website_content: str,
+                         industry: str) -> Tuple[str, str, bool]:
+        """One provider's full analysis (cache, call, validate, re-ask) as (summary, pitch, validated).
+        
+        `validated` is False for a fallback parse of a reply that never validated. Raises if the call fails.
+        """
+        prompt = self._analysis_prompt(provider, company_name, website_content, industry)
+        model = self._model_name(provider)
+        cached = self._cache_get('llm', provider, model, prompt)
+        if cached:
+            # Only validated answers are cached
+            return cached[0], cached[1], True
+        
+        content = self._complete(provider, prompt, json_output=True)
+        reasks = 0
+        while True:
+            try:
+                result = parse_analysis(content)
+                break
+            except AnalysisValidationError as e:
+                if not self._should_reask(provider, e, reasks):
+                    # Fallback answers are not cached so the next run asks again
+                    return self._fallback_analysis(provider, content) + (False,)
+                reasks += 1
+                content = self._complete(provider, build_reask_prompt(prompt, content, e), json_output=True)
+        
+        self.metrics.increment('llm_parse_ok' if reasks == 0 else 'llm_parse_reask_ok')
+        self._cache_set('llm', list(result), provider, model, prompt)
+        return result + (True,)
+    
+    def _fallback_analysis(self, provider: str, content: str) -> Tuple[str, str]:
+        """Best answer from a reply that never validated: its JSON fields if it is JSON, else text heuristics."""
+        salvaged = salvage_analysis(content)
+        if salvaged is None:
+            return self._parse_analysis(provider, content)
+        summary, pitch = salvaged
+        return summary or FAILED_SUMMARY, pitch or FAILED_PITCH
+    
+    def _should_reask(self, provider: str, error: AnalysisValidationError, reasks: int) -> bool:
+        self.metrics.increment('llm_parse_invalid')
+        if reasks >= self.max_reasks:
+            self.metrics.increment('llm_parse_fallback')
+            logger.warning(f"{provider} answer still invalid after {reasks} re-ask(s) ({error}); using a fallback parse")
+            return False
+        self.metrics.increment('llm_reasks')
+        logger.info(f"{provider} answer failed validation ({error}); re-asking")
+        return True
+    
+    def parse_stats(self) -> Dict[str, float]:
+        """How many LLM answers validated first time, after a re-ask, or fell back to a best-effort parse."""
+        return parse_success_report(self.metrics.counters)
+    
+    def analyze_with_router(self, company_name: str, website_content: str, industry: str) -> Tuple[str, str, bool]:
+        """(summary, pitch, validated) from whichever provider answers first, hedging slow calls and failing over."""
+        try:
+            return self.llm_router.call(
+                lambda provider: self._analyze_attempt(provider, company_name, website_content, industry))
+        except Exception as e:
+            logger.error(f"LLM error for {company_name} on every provider: {e}")
+            return FAILED_SUMMARY, FAILED_PITCH, False
+    
+    def collect_company_info(self, company_name: str) -> Tuple[CompanyData, str]:
+        """Cheap stage of enrichment: website, homepage content and industry, no LLM call."""
         logger.info(f"Enriching data for: {company_name}")
         company = CompanyData(name=company_name)
-        basic_info = self.get_company_basic_info(company_name)
+        with self.metrics.track_row() as timings:
+            basic_info = self.get_company_basic_info(company_name)
+        company.timings.update(timings)
         company.website = basic_info['website']
         company.industry = basic_info['industry']
+        company.industry_confidence = basic_info.get('industry_confidence', 0.0)
         company.company_size = basic_info['company_size']
         company.location = basic_info['location']
 
         website_content = ""
         if company.website and company.website != 'Unknown':
-            website_content = self.scrape_website_content(company.website)
+            website_content = self.scrape_website_content(company.website, page=basic_info.get('page'))
+        
+        page = basic_info.get('page')
+        if page is not None:
+            company.etag, company.last_modified = page.etag, page.last_modified
+        if website_content:
+            company.content_hash, company.content_simhash = content_hash(website_content), simhash(website_content)
+        previous = basic_info.get('previous')
+        if previous and self._content_unchanged(company, previous, page):
+            company.content_unchanged = True
+            company.llm_analyzed = True
+            company.summary = previous['summary_from_llm']
+            company.automation_pitch = previous.get('automation_pitch_from_llm') or ''
+            # Keep comparing against the text the summary was written from, so small edits cannot add up unnoticed
+            company.content_hash = previous.get('content_hash') or company.content_hash
+            company.content_simhash = previous.get('content_simhash') or company.content_simhash
+            company.etag = company.etag or previous.get('etag') or ''
+            company.last_modified = company.last_modified or previous.get('last_modified') or ''
         
-        if self.gemini_api_key:
-            summary, pitch = self.analyze_with_gemini(company_name, website_content, company.industry)
-        elif self.openai_api_key:
-            summary, pitch = self.analyze_with_openai(company_name, website_content, company.industry)
+        return company, website_content
+    
+    @staticmethod
+    def _has_fingerprint(row: Dict[str, object]) -> bool:
+        return any(row.get(name) for name in CHANGE_COLUMNS)
+    
+    def _content_unchanged(self, company: CompanyData, previous: Dict[str, object], page: Optional[WebPage]) -> bool:
+        if page is not None and page.not_modified:
+            return True
+        if not company.content_hash:
+            return False
+        if company.content_hash == previous.get('content_hash'):
+            return True
+        return similarity(company.content_simhash, previous.get('content_simhash')) >= self.change_threshold
+    
+    def analyze_company(self, company: CompanyData, website_content: str) -> None:
+        if company.content_unchanged:
+            self.metrics.increment('llm_skipped_unchanged')
+            return
+        provider = self._llm_provider()
+        if provider is not None:
+            with self.metrics.track_row() as timings:
+                summary, pitch, company.llm_analyzed = self.analyze_with_router(
+                    company.name, website_content, company.industry)
+            company.timings['llm'] = company.timings.get('llm', 0.0) + timings.get('llm', 0.0)
         else:
-            summary = f"{company_name} operates in the {company.industry} industry."
+            summary = f"{company.name} operates in the {company.industry} industry."
             pitch = "QF Innovate can provide custom AI automation solutions to streamline your business processes."
         
         company.summary = summary
         company.automation_pitch = pitch
-        time.sleep(1)
+    
+    def analyze_batch(self, companies: List[Tuple[CompanyData, str]]) -> None:
+        """Analyze several companies with one LLM request, retrying unparseable items one at a time."""
+        unchanged = sum(1 for company, _ in companies if company.content_unchanged)
+        if unchanged:
+            self.metrics.increment('llm_skipped_unchanged', unchanged)
+            companies = [(company, content) for company, content in companies if not company.content_unchanged]
+        provider = self._llm_provider()
+        if provider is None or len(companies) <= 1:
+            for company, website_content in companies:
+                self.analyze_company(company, website_content)
+            return
+        
+        pending = []
+        for company, website_content in companies:
+            context = self._prompt_context(website_content)
+            cached = self._cached_batch_item(company, context)
+            if cached:
+                company.summary, company.automation_pitch = cached
+                company.llm_analyzed = True
+            else:
+                pending.append((company, website_content, context))
+        if not pending:
+            return
+        
+        parsed = {}
+        try:
+            prompt = build_batch_prompt([(company.name, company.industry, context)
+                                         for company, _, context in pending])
+            with self.metrics.track_row() as timings:
+                # The router may fail over, so each attempt reports which provider answered
+                provider, response_text = self.llm_router.call(
+                    lambda provider: (provider, self._complete(provider, prompt, max_tokens=300 * len(pending), batch=True)))
+            # One request served the whole batch, so each company carries its share of the latency
+            for company, _, _ in pending:
+                company.timings['llm'] = timings.get('llm', 0.0) / len(pending)
+            parsed = parse_batch_response(response_text, len(pending))
+            self.metrics.increment('llm_parse_ok', len(parsed))
+        except Exception as e:
+            logger.error(f"Batch {provider} API error for {len(pending)} companies: {e}")
+        
+        if len(parsed) < len(pending):
+            logger.warning(f"Batch response covered {len(parsed)}/{len(pending)} companies; retrying the rest individually")
         
+        for idx, (company, website_content, context) in enumerate(pending):
+            if idx in parsed:
+                company.summary, company.automation_pitch = parsed[idx]
+                company.llm_analyzed = True
+                self._cache_set('llm', list(parsed[idx]), provider, self._model_name(provider), 'batch-item',
+                                company.name, company.industry, context)
+            else:
+                self.analyze_company(company, website_content)
+    
+    def _cached_batch_item(self, company: CompanyData, context: str) -> Optional[List[str]]:
+        """A batch answer cached by any configured provider, preferred provider first."""
+        for provider in self.llm_router.order():
+            cached = self._cache_get('llm', provider, self._model_name(provider), 'batch-item',
+                                     company.name, company.industry, context)
+            if cached:
+                return cached
+        return None
+    
+    def enrich_company(self, company_name: str) -> CompanyData:
+        company, website_content = self.collect_company_info(company_name)
+        self.analyze_company(company, website_content)
         return company
     
-    def process_csv(self, input_file: str, output_file: str = None) -> pd.DataFrame:
+    @property
+    def output_columns(self) -> List[str]:
+        columns = OUTPUT_COLUMNS + ['lead_score', 'lead_tier'] if self.lead_policy is not None else OUTPUT_COLUMNS
+        return columns + ['timing_ms'] if self.timing_column else columns
+    
+    def _company_row(self, company_data: CompanyData) -> Dict[str, str]:
+        self.metrics.increment('rows_enriched')
+        row = {
+            'company_name': company_data.name,
+            'website': company_data.website,
+            'industry': company_data.industry,
+            'summary_from_llm': company_data.summary,
+            'automation_pitch_from_llm': company_data.automation_pitch
+        }
+        if self.lead_policy is not None:
+            row['lead_score'] = company_data.lead_score
+            row['lead_tier'] = company_data.lead_tier
+        if self.previous_results is not None:
+            # Only lead store rows carry these; output files keep their columns. Template and failure
+            # summaries get none, so the next refresh analyzes the lead instead of keeping them.
+            row.update({name: getattr(company_data, name) if company_data.llm_analyzed else ''
+                        for name in CHANGE_COLUMNS})
+        if self.timing_column:
+            row['timing_ms'] = json.dumps({stage: round(seconds * 1000) for stage, seconds in company_data.timings.items()})
+        return row
+    
+    def _error_row(self, company_name: str, error: Exception) -> Dict[str, str]:
+        self.metrics.record_error('row', error)
+        row = {
+            'company_name': company_name,
+            'website': 'Error',
+            'industry': 'Error',
+            'summary_from_llm': f'Error processing: {str(error)}',
+            'automation_pitch_from_llm': 'Unable to generate pitch'
+        }
+        if self.lead_policy is not None:
+            row['lead_score'] = None
+            row['lead_tier'] = 'error'
+        if self.timing_column:
+            row['timing_ms'] = '{}'
+        return row
+    
+    def _enrich_row(self, company_name: str) -> Dict[str, str]:
+        try:
+            with self.metrics.timer('row'):
+                company = self.enrich_company(company_name)
+            return self._company_row(company)
+        except Exception as e:
+            logger.error(f"Error processing {company_name}: {e}")
+            return self._error_row(company_name, e)
+    
+    def _collect_row(self, company_name: str):
+        """Cheap stage of one row; a failed row's latency is recorded here, a collected one's once it is analyzed."""
+        started = time.perf_counter()
         try:
-            df = pd.read_csv(input_file)
+            company, website_content = self.collect_company_info(company_name)
+        except Exception as e:
+            self.metrics.observe('row', time.perf_counter() - started)
+            logger.error(f"Error processing {company_name}: {e}")
+            return None, e
+        company.collect_seconds = time.perf_counter() - started
+        return (company, website_content), None
+    
+    def _analyze_rows(self, batch) -> List[Tuple[str, Dict[str, str]]]:
+        collected = [info for _, (info, _) in batch if info is not None]
+        started = time.perf_counter()
+        try:
+            self.analyze_batch(collected)
+        except Exception as e:
+            logger.error(f"Error analyzing batch of {len(collected)} companies: {e}")
+            return [(name, self._error_row(name, error or e)) for name, (_, error) in batch]
+        finally:
+            # Every company in the batch waited for the whole request
+            batch_seconds = time.perf_counter() - started
+            for company, _ in collected:
+                self.metrics.observe('row', company.collect_seconds + batch_seconds)
+        return [
+            (name, self._company_row(info[0]) if info is not None else self._error_row(name, error))
+            for name, (info, error) in batch
+        ]
+    
+    def _ordered_map(self, func, items, workers: int = 1):
+        """Yield (item, func(item)) in input order, keeping up to `workers` items in flight."""
+        if workers <= 1:
+            for item in items:
+                yield item, func(item)
+            return
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for item in items:
+                pending.append((item, executor.submit(func, item)))
+                # Bounded look-ahead keeps memory flat while the head of the queue finishes
+                if len(pending) >= workers * 2:
+                    head, future = pending.popleft()
+                    yield head, future.result()
+            while pending:
+                head, future = pending.popleft()
+                yield head, future.result()
+    
+    def enrich_many(self, company_names, workers: int = 1, batch_size: int = 1):
+        """Yield (company_name, row) pairs in input order, keeping up to `workers` companies in flight.
+        
+        With `batch_size` > 1 the LLM stage packs that many companies into each request.
+        With a lead policy, rows come back in priority order within each window instead.
+        """
+        if self.lead_policy is not None:
+            yield from self._enrich_tiered(company_names, workers, batch_size)
+            return
+        
+        if batch_size <= 1 or self._llm_provider() is None:
+            yield from self._ordered_map(self._enrich_row, company_names, workers)
+            return
+        
+        collected = self._ordered_map(self._collect_row, company_names, workers)
+        batches = iter(lambda: list(islice(collected, batch_size)), [])
+        for _, rows in self._ordered_map(self._analyze_rows, batches, workers):
+            yield from rows
+    
+    def _analyze_row(self, item) -> Dict[str, str]:
+        company_name, (company, website_content) = item
+        started = time.perf_counter()
+        try:
+            self.analyze_company(company, website_content)
+            return self._company_row(company)
+        except Exception as e:
+            logger.error(f"Error processing {company_name}: {e}")
+            return self._error_row(company_name, e)
+        finally:
+            self.metrics.observe('row', company.collect_seconds + time.perf_counter() - started)
+    
+    def _score_lead(self, company: CompanyData, website_content: str) -> bool:
+        """Set the lead policy's score and tier on a collected company; True if it qualifies for the LLM."""
+        if company.content_unchanged:
+            company.lead_score = self.lead_policy.score(company.industry, company.industry_confidence)
+            company.lead_tier = SKIP_UNCHANGED
+        else:
+            company.lead_score, company.lead_tier = self.lead_policy.evaluate(
+                company.website, company.industry, company.industry_confidence, website_content)
+        self.metrics.increment(f'leads_{company.lead_tier}')
+        return company.lead_tier == QUALIFIED
+    
+    def _enrich_tiered(self, company_names, workers: int = 1, batch_size: int = 1):
+        """Cheap pass (website, homepage, industry) over a window of rows, then LLM calls for qualifying leads.
+        
+        Qualified leads are yielded best score first, then the leads the policy skipped
+        and the rows that failed, so paid calls go only where they count.
+        """
+        names = iter(company_names)
+        while True:
+            window = list(islice(names, self.priority_window))
+            if not window:
+                return
             
-            if 'company_name' not in df.columns:
-                raise ValueError("CSV must contain 'company_name' column")
+            qualified, skipped = [], []
+            for company_name, (info, error) in self._ordered_map(self._collect_row, window, workers):
+                if info is None:
+                    skipped.append((company_name, self._error_row(company_name, error)))
+                    continue
+                company, website_content = info
+                if self._score_lead(company, website_content):
+                    qualified.append((company_name, info))
+                else:
+                    self.metrics.observe('row', company.collect_seconds)
+                    skipped.append((company_name, self._company_row(company)))
             
-            results = []
-            total_companies = len(df)
+            # Stable sort: equal scores keep input order
+            qualified.sort(key=lambda item: -item[1][0].lead_score)
+            logger.info(f"{len(qualified)}/{len(window)} leads qualify for the LLM stage")
+            if batch_size > 1 and self._llm_provider() is not None:
+                batches = [[(name, (info, None)) for name, info in qualified[idx:idx + batch_size]]
+                           for idx in range(0, len(qualified), batch_size)]
+                for _, rows in self._ordered_map(self._analyze_rows, batches, workers):
+                    yield from rows
+            else:
+                for (company_name, _), row in self._ordered_map(self._analyze_row, qualified, workers):
+                    yield company_name, row
+            yield from skipped
+    
+    def enrich_deduplicated(self, deduplicator: CompanyDeduplicator, company_names_factory,
+                            workers: int = 1, batch_size: int = 1):
+        """Like enrich_many, but each duplicate group is enriched once and fanned out to all its rows.
+        
+        `company_names_factory` returns a fresh iterator over the input names each call; it is
+        read once to count rows per group, once to feed enrichment and once to emit rows.
+        """
+        remaining = Counter(deduplicator.group_of(name) for name in company_names_factory())
+        
+        def representatives():
+            seen = set()
+            for name in company_names_factory():
+                group = deduplicator.group_of(name)
+                if group not in seen:
+                    seen.add(group)
+                    yield deduplicator.representative(group)
+        
+        enriched = self.enrich_many(representatives(), workers, batch_size)
+        results = {}
+        for company_name in company_names_factory():
+            group = deduplicator.group_of(company_name)
+            # Groups are enriched in order of first appearance, so the one we need is next at worst
+            while group not in results:
+                representative, row = next(enriched)
+                results[deduplicator.group_of(representative)] = row
+            row = dict(results[group], company_name=company_name)
+            remaining[group] -= 1
+            if not remaining[group]:
+                del results[group]
+            yield company_name, row
+    
+    def warm_cache(self, company_names, workers: int = 1) -> Tuple[int, int]:
+        """Pre-fill the search and page layers without spending any LLM calls.
+        
+        Returns (companies seen, homepages reachable).
+        """
+        def warm(company_name):
+            website = self.search_company_website(company_name)
+            return website != 'Unknown' and self.fetch_page(website).ok
+        
+        seen = reachable = 0
+        for _, ok in self._ordered_map(warm, company_names, workers):
+            seen += 1
+            reachable += int(ok)
+        return seen, reachable
+    
+    def iter_csv_companies(self, input_file: str, chunksize: int = 1000, skip_rows: int = 0):
+        """Yield company names from a CSV (or Parquet/Arrow file) one chunk at a time so huge inputs run in constant memory."""
+        if columnar_format(input_file):
+            yield from iter_columnar_companies(input_file, batch_size=chunksize, skip_rows=skip_rows)
+            return
+        
+        import pandas as pd
+        header = pd.read_csv(input_file, nrows=0)
+        if 'company_name' not in header.columns:
+            raise ValueError("CSV must contain 'company_name' column")
+        
+        skiprows = range(1, skip_rows + 1) if skip_rows else None
+        for chunk in pd.read_csv(input_file, usecols=['company_name'], chunksize=chunksize, skiprows=skiprows):
+            yield from chunk['company_name']
+    
+    def stream_csv(self, input_file: str, output_file: str, workers: int = 1,
+                   resume: bool = False, chunksize: int = 1000, batch_size: int = 1,
+                   deduplicator: Optional[CompanyDeduplicator] = None) -> int:
+        """Enrich `input_file` into `output_file` row by row, checkpointing as it goes.
+        
+        Returns the total number of rows in the output once the run finishes.
+        """
+        if columnar_format(output_file):
+            if resume:
+                raise ValueError("--resume needs a CSV output file; Parquet/Arrow files cannot be appended to")
+            return self._stream_columnar(input_file, output_file, workers, chunksize, batch_size, deduplicator)
+        
+        checkpoint = RunCheckpoint(output_file)
+        rows_done, complete = self._resume_output(checkpoint, input_file, output_file, resume)
+        if complete:
+            return rows_done
+        
+        mode = 'a' if rows_done else 'w'
+        with open(output_file, mode, newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self.output_columns, lineterminator='\n')
+            if not rows_done:
+                writer.writeheader()
+                f.flush()
+                checkpoint.save(input_file, 0, f.tell())
             
-            logger.info(f"Processing {total_companies} companies...")
+            # Tiered runs reorder rows within each window, so only whole windows are safe to resume after
+            checkpoint_every = self.priority_window if self.lead_policy is not None and deduplicator is None else 1
+            for company_name, row in self._enrich_csv(input_file, chunksize, rows_done, workers, batch_size, deduplicator):
+                writer.writerow(row)
+                f.flush()
+                rows_done += 1
+                if rows_done % checkpoint_every == 0:
+                    checkpoint.save(input_file, rows_done, f.tell())
+                logger.info(f"Processed {rows_done}: {company_name}")
             
-            for idx, row in df.iterrows():
-                company_name = row['company_name']
-                logger.info(f"Processing {idx + 1}/{total_companies}: {company_name}")
-                
-                try:
-                    company_data = self.enrich_company(company_name)
-                    results.append({
-                        'company_name': company_data.name,
-                        'website': company_data.website,
-                        'industry': company_data.industry,
-                        'summary_from_llm': company_data.summary,
-                        'automation_pitch_from_llm': company_data.automation_pitch
-                    })
-                except Exception as e:
-                    logger.error(f"Error processing {company_name}: {e}")
-                    results.append({
-                        'company_name': company_name,
-                        'website': 'Error',
-                        'industry': 'Error',
-                        'summary_from_llm': f'Error processing: {str(e)}',
-                        'automation_pitch_from_llm': 'Unable to generate pitch'
-                    })
+            checkpoint.save(input_file, rows_done, f.tell(), complete=True)
+        
+        logger.info(f"Results saved to {output_file}")
+        return rows_done
+    
+    def _stream_columnar(self, input_file: str, output_file: str, workers: int, chunksize: int, batch_size: int,
+                         deduplicator: Optional[CompanyDeduplicator] = None) -> int:
+        rows_done = 0
+        tmp_path = f"{output_file}.tmp{os.path.splitext(output_file)[1]}"
+        with ColumnarWriter(tmp_path, self.output_columns, batch_rows=chunksize) as writer:
+            for company_name, row in self._enrich_csv(input_file, chunksize, 0, workers, batch_size, deduplicator):
+                writer.write(row)
+                rows_done += 1
+                logger.info(f"Processed {rows_done}: {company_name}")
+        os.replace(tmp_path, output_file)
+        logger.info(f"Results saved to {output_file}")
+        return rows_done
+    
+    def _resume_output(self, checkpoint: RunCheckpoint, input_file: str, output_file: str,
+                       resume: bool) -> Tuple[int, bool]:
+        """Return (rows already written, whether the run is complete), trimming any unconfirmed tail."""
+        state = checkpoint.load() if resume else None
+        if state and os.path.exists(output_file):
+            if state['input_file'] != os.path.abspath(input_file):
+                raise ValueError(f"Checkpoint for {output_file} belongs to {state['input_file']}")
+            rows_done = state['rows_done']
+            if state.get('complete'):
+                logger.info(f"{output_file} is already complete ({rows_done} rows)")
+                return rows_done, True
+            # Drop anything written after the last checkpoint (e.g. a half-flushed row)
+            with open(output_file, 'r+b') as f:
+                f.truncate(state['output_bytes'])
+            logger.info(f"Resuming {input_file} after {rows_done} completed rows")
+            return rows_done, False
+        if resume and os.path.exists(output_file):
+            logger.warning(f"No checkpoint found for {output_file}; starting from scratch")
+        return 0, False
+    
+    def _enrich_csv(self, input_file: str, chunksize: int, skip_rows: int, workers: int, batch_size: int,
+                    deduplicator: Optional[CompanyDeduplicator] = None):
+        if deduplicator is None:
+            company_names = self.iter_csv_companies(input_file, chunksize=chunksize, skip_rows=skip_rows)
+            return self.enrich_many(company_names, workers, batch_size)
+        
+        def company_names_factory():
+            return self.iter_csv_companies(input_file, chunksize=chunksize, skip_rows=skip_rows)
+        return self.enrich_deduplicated(deduplicator, company_names_factory, workers, batch_size)
+    
+    def deduplicate_csv(self, input_file: str, chunksize: int = 1000, threshold: float = 0.92) -> CompanyDeduplicator:
+        """Group duplicate company names in `input_file` ahead of enrichment and log the calls saved."""
+        deduplicator = CompanyDeduplicator(threshold).fit(self.iter_csv_companies(input_file, chunksize=chunksize))
+        report = deduplicator.report()
+        self.metrics.increment('dedup_groups', report['groups'])
+        self.metrics.increment('dedup_enrichments_saved', report['enrichments_saved'])
+        logger.info(f"Deduplicated {report['rows']} rows into {report['groups']} companies "
+                    f"({report['enrichments_saved']} enrichments saved)")
+        return deduplicator
+    
+    def process_csv(self, input_file: str, output_file: str = None, workers: int = 1,
+                    resume: bool = False, chunksize: int = 1000, batch_size: int = 1,
+                    dedupe: bool = False) -> 'pd.DataFrame':
+        try:
+            deduplicator = self.deduplicate_csv(input_file, chunksize) if dedupe else None
+            if output_file:
+                self.stream_csv(input_file, output_file, workers=workers, resume=resume,
+                                chunksize=chunksize, batch_size=batch_size, deduplicator=deduplicator)
+                return self.read_output(output_file)
             
-            results_df = pd.DataFrame(results)
+            logger.info(f"Processing {input_file} with {workers} worker(s)...")
             
-            if output_file:
-                results_df.to_csv(output_file, index=False)
-                logger.info(f"Results saved to {output_file}")
+            results = ResultTable(self.output_columns)
+            rows = self._enrich_csv(input_file, chunksize, 0, workers, batch_size, deduplicator)
+            for idx, (company_name, row) in enumerate(rows):
+                logger.info(f"Processed {idx + 1}: {company_name}")
+                results.append(row)
             
-            return results_df
+            return results.to_frame()
             
         except Exception as e:
             logger.error(f"Error processing CSV: {e}")
             raise
+    
+    def read_output(self, output_file: str) -> 'pd.DataFrame':
+        import pandas as pd
+        fmt = columnar_format(output_file)
+        if fmt == 'parquet':
+            return pd.read_parquet(output_file)
+        if fmt == 'arrow':
+            return pd.read_feather(output_file)
+        return pd.read_csv(output_file, keep_default_na=False)
+    
+    def upsert_leads(self, input_file: str, store: LeadStore, max_age_days: float = 30, workers: int = 1,
+                     chunksize: int = 1000, batch_size: int = 1,
+                     change_threshold: float = DEFAULT_CHANGE_THRESHOLD) -> Dict[str, int]:
+        """Enrich only the input companies that are missing from `store` or older than `max_age_days`.
+        
+        Fresh rows are merged into the store by normalized company name as they finish; rows
+        that failed are left out so the next run tries them again. A stale lead whose homepage
+        answers 304 Not Modified, or whose text fingerprint is at least `change_threshold`
+        similar to the stored one, keeps its stored summary and pitch without an LLM call.
+        """
+        self.previous_results, self.change_threshold = store, change_threshold
+        try:
+            return self._upsert_stale(input_file, store, max_age_days, workers, chunksize, batch_size)
+        finally:
+            self.previous_results = None
+    
+    def _upsert_stale(self, input_file: str, store: LeadStore, max_age_days: float, workers: int,
+                      chunksize: int, batch_size: int) -> Dict[str, int]:
+        stats = Counter()
+        
+        def counted_names():
+            for name in self.iter_csv_companies(input_file, chunksize=chunksize):
+                stats['input_rows'] += 1
+                yield name
+        
+        stale = store.stale_names(counted_names(), max_age_days * 24 * 3600, batch_size=chunksize)
+        pending = []
+        for company_name, row in self.enrich_many(stale, workers, batch_size):
+            if row['website'] == 'Error':
+                stats['failed'] += 1
+                continue
+            pending.append(row)
+            if len(pending) >= chunksize:
+                stats['upserted'] += store.upsert(pending)
+                pending = []
+            logger.info(f"Enriched {stats['upserted'] + len(pending)}: {company_name}")
+        stats['upserted'] += store.upsert(pending)
+        self.metrics.increment('leads_upserted', stats['upserted'])
+        return {name: stats[name] for name in ('input_rows', 'upserted', 'failed')}
+    
+    def enqueue_csv(self, queue: WorkQueue, input_file: str, item_size: int = DEFAULT_ITEM_SIZE,
+                    chunksize: int = 1000, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """Coordinator side: split `input_file` into work items of `item_size` rows. Returns items added."""
+        rows_enqueued = queue.open_input(input_file, max_attempts=max_attempts)
+        if queue.sealed:
+            logger.info(f"{input_file} is already fully enqueued in {queue.path}")
+            return 0
+        company_names = self.iter_csv_companies(input_file, chunksize=chunksize, skip_rows=rows_enqueued)
+        added = queue.enqueue(company_names, start_row=rows_enqueued, item_size=item_size)
+        queue.seal()
+        logger.info(f"Enqueued {added} work items from {input_file} (resumed after {rows_enqueued} rows)")
+        return added
+    
+    def _keep_lease(self, queue: WorkQueue, item: WorkItem, worker_id: str, lease_seconds: float,
+                    stop: threading.Event) -> None:
+        while not stop.wait(lease_seconds / 3):
+            if not queue.renew(item, worker_id, lease_seconds):
+                logger.warning(f"Lost the lease on work item {item.id}; another worker may repeat it")
+                return
+    
+    def run_worker(self, queue: WorkQueue, worker_id: str, workers: int = 1, batch_size: int = 1,
+                   lease_seconds: float = DEFAULT_LEASE_SECONDS, poll_interval: float = 2.0) -> int:
+        """Worker side: lease and enrich work items until the queue is finished. Returns items completed."""
+        queue.bind_columns(self.output_columns)
+        completed = 0
+        while True:
+            item = queue.lease(worker_id, lease_seconds)
+            if item is None:
+                if queue.finished():
+                    return completed
+                # Nothing free right now: the coordinator is still enqueueing or other workers hold the rest
+                time.sleep(poll_interval)
+                continue
+            
+            stop = threading.Event()
+            heartbeat = threading.Thread(target=self._keep_lease, args=(queue, item, worker_id, lease_seconds, stop),
+                                         daemon=True)
+            heartbeat.start()
+            try:
+                # Tiered runs return rows best lead first; put them back in item order
+                rows_by_name = defaultdict(deque)
+                for company_name, row in self.enrich_many(item.company_names, workers, batch_size):
+                    rows_by_name[company_name].append(row)
+                rows = [rows_by_name[company_name].popleft() for company_name in item.company_names]
+            except Exception as e:
+                retry = queue.fail(item, worker_id, e)
+                logger.error(f"Work item {item.id} failed on attempt {item.attempts}: {e}"
+                             f"{'; will retry' if retry else '; giving up'}")
+                continue
+            finally:
+                stop.set()
+                heartbeat.join()
+            
+            if queue.complete(item, rows):
+                completed += 1
+                logger.info(f"Completed work item {item.id} (rows {item.start_row}-{item.start_row + len(rows) - 1})")
+            else:
+                logger.info(f"Work item {item.id} was already completed by another worker; result discarded")
+    
+    def export_queue(self, queue: WorkQueue, output_file: str) -> int:
+        """Write every row of a finished queue to `output_file` in input order; failed items become error rows.
+        
+        The columns are the ones the workers wrote, and the format follows the extension as in `stream_csv`.
+        """
+        columns = queue.columns or self.output_columns
+        rows_written = 0
+        if columnar_format(output_file):
+            tmp_path = f"{output_file}.tmp{os.path.splitext(output_file)[1]}"
+            with ColumnarWriter(tmp_path, columns) as writer:
+                for row in self._queue_rows(queue):
+                    writer.write(row)
+                    rows_written += 1
+        else:
+            tmp_path = f"{output_file}.tmp"
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=columns, lineterminator='\n', extrasaction='ignore')
+                writer.writeheader()
+                for row in self._queue_rows(queue):
+                    writer.writerow(row)
+                    rows_written += 1
+        os.replace(tmp_path, output_file)
+        logger.info(f"Results saved to {output_file}")
+        return rows_written
+    
+    def _queue_rows(self, queue: WorkQueue):
+        for _, company_name, row, error in queue.iter_rows():
+            if row is None:
+                row = self._error_row(company_name, RuntimeError(error or 'work item was not processed'))
+            yield row
+
+QUEUE_COMMANDS = ('coordinator', 'worker')
+
+def _add_bot_arguments(parser) -> None:
+    parser.add_argument('--openai-key', help='OpenAI API key')
+    parser.add_argument('--gemini-key', help='Google Gemini API key')
+    parser.add_argument('--workers', type=int, default=1, help='Number of companies to enrich concurrently')
+    parser.add_argument('--llm-batch-size', type=int, default=1, help='Companies packed into each LLM request')
+    parser.add_argument('--llm-providers', default='gemini,openai', help='Comma-separated LLM provider preference order')
+    parser.add_argument('--no-hedge', action='store_true', help='Only fail over on errors; never send a second request for a slow call')
+    parser.add_argument('--no-json-mode', action='store_true', help="Don't request native JSON output (for OpenAI-compatible servers without response_format)")
+    parser.add_argument('--max-reasks', type=int, default=1, help='Re-ask a provider this many times when its answer fails schema validation')
+    parser.add_argument('--openai-base-url', help='Alternative OpenAI-compatible API base URL')
+    parser.add_argument('--max-per-host', type=int, default=2, help='Max concurrent requests to a single website')
+    parser.add_argument('--max-per-provider', type=int, default=4, help='Max concurrent calls to each LLM provider')
+    parser.add_argument('--gemini-rpm', type=float, default=DEFAULT_PROVIDER_RATES['gemini']['requests_per_minute'], help='Starting Gemini requests/min')
+    parser.add_argument('--openai-rpm', type=float, default=DEFAULT_PROVIDER_RATES['openai']['requests_per_minute'], help='Starting OpenAI requests/min')
+    parser.add_argument('--domain-rpm', type=float, default=DEFAULT_DOMAIN_RPM, help='Starting requests/min to any one website')
+    parser.add_argument('--industry-taxonomy', help='JSON file mapping industry names to keyword lists')
+    parser.add_argument('--domain-index', help='JSON file of known company -> website mappings, updated after the run')
+    parser.add_argument('--seed-domain-index', help='Previous enriched CSV whose websites seed the domain index')
+    parser.add_argument('--parse-processes', type=int, default=0, help='Parse and classify homepages in this many worker processes (0 = in-process)')
+    parser.add_argument('--lead-policy', help='JSON lead policy: only qualifying leads get LLM calls, highest score first')
+    parser.add_argument('--priority-window', type=int, default=DEFAULT_PRIORITY_WINDOW, help='Rows scored together before their LLM stage runs in priority order')
+    parser.add_argument('--prompt-token-budget', type=int, default=DEFAULT_TOKEN_BUDGET, help='Approximate tokens of website content sent per company to the LLM')
+    parser.add_argument('--max-page-kb', type=int, default=MAX_PAGE_BYTES // 1024, help='Stop downloading a homepage after this many KB')
+    parser.add_argument('--pool-size', type=int, default=20, help='Keep-alive connections kept per host pool')
+    parser.add_argument('--max-retries', type=int, default=3, help='Retries with backoff on 429/5xx and connection errors')
+    parser.add_argument('--metrics-file', help='Write a run profile report here (.prom for Prometheus text, otherwise JSON)')
+    parser.add_argument('--timing-column', action='store_true', help='Add a per-row timing_ms column to the output')
+    parser.add_argument('--cache-path', default=DEFAULT_CACHE_PATH, help='SQLite file for the search/page/LLM cache')
+    parser.add_argument('--cache-max-mb', type=int, default=512, help='Evict least recently used cache entries above this size')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the cache entirely')
+    parser.add_argument('--refresh-cache', action='store_true', help='Ignore cached entries but store fresh results')
+
+def _build_bot(args, parser) -> LeadEnrichmentBot:
+    cache = None
+    if not args.no_cache:
+        cache = EnrichmentCache(args.cache_path, max_bytes=args.cache_max_mb * 1024 * 1024,
+                                read=not args.refresh_cache)
+    
+    transport = HttpTransport(pool_connections=args.pool_size, pool_maxsize=args.pool_size,
+                              max_retries=args.max_retries)
+    domain_index = DomainIndex(args.domain_index)
+    if args.seed_domain_index:
+        seeded = domain_index.load_csv(args.seed_domain_index)
+        logger.info(f"Seeded domain index with {seeded} websites from {args.seed_domain_index}")
+    
+    openai_api_key = args.openai_key or os.getenv('OPENAI_API_KEY')
+    gemini_api_key = args.gemini_key or os.getenv('GEMINI_API_KEY')
+    api_keys = {'openai': openai_api_key, 'gemini': gemini_api_key}
+    providers = [p.strip() for p in args.llm_providers.split(',') if p.strip()]
+    unknown = [p for p in providers if p not in api_keys]
+    if unknown:
+        parser.error(f"Unknown LLM provider(s): {', '.join(unknown)}")
+    llm_router = LLMRouter([p for p in providers if api_keys[p]], hedge=not args.no_hedge,
+                           max_workers=max(32, args.workers * 2))
+    
+    industry_classifier = IndustryClassifier.from_file(args.industry_taxonomy) if args.industry_taxonomy else IndustryClassifier()
+    parse_pool = ParsePool(args.parse_processes, taxonomy=industry_classifier.taxonomy) if args.parse_processes > 0 else None
+    
+    return LeadEnrichmentBot(
+        openai_api_key=openai_api_key,
+        gemini_api_key=gemini_api_key,
+        openai_api_base=args.openai_base_url or os.getenv('OPENAI_API_BASE'),
+        max_per_host=args.max_per_host,
+        max_per_provider=args.max_per_provider,
+        provider_rates={
+            'gemini': dict(DEFAULT_PROVIDER_RATES['gemini'], requests_per_minute=args.gemini_rpm),
+            'openai': dict(DEFAULT_PROVIDER_RATES['openai'], requests_per_minute=args.openai_rpm),
+        },
+        domain_rpm=args.domain_rpm,
+        timing_column=args.timing_column,
+        max_page_bytes=args.max_page_kb * 1024,
+        industry_classifier=industry_classifier,
+        parse_pool=parse_pool,
+        cache=cache,
+        transport=transport,
+        domain_resolver=DomainResolver(transport, index=domain_index),
+        llm_router=llm_router,
+        json_mode=not args.no_json_mode,
+        max_reasks=args.max_reasks,
+        prompt_token_budget=args.prompt_token_budget,
+        lead_policy=LeadPolicy.from_file(args.lead_policy) if args.lead_policy else None,
+        priority_window=args.priority_window
+    )
+
+def _finish_bot(bot: LeadEnrichmentBot) -> None:
+    # Saves the domain index and stops the resolver's lookup threads
+    bot.domain_resolver.close()
+    if bot.parse_pool is not None:
+        bot.parse_pool.close()
+
+def _print_run_report(bot: LeadEnrichmentBot, metrics_file: Optional[str] = None) -> None:
+    if bot.cache is not None:
+        print(f"Cache hits/misses: {bot.cache.stats()}")
+    rates = bot.rate_snapshot()
+    throttled_domains = sum(1 for snapshot in rates['domains'].values() if snapshot['throttled'])
+    print(f"Provider rates: {rates['providers']}")
+    if bot.llm_router.providers:
+        print(f"LLM providers: {bot.llm_router.snapshot()}")
+        print(f"Structured output: {bot.parse_stats()}")
+    print(f"Domains contacted: {len(rates['domains'])} ({throttled_domains} throttled)")
+    
+    if metrics_file:
+        fmt = 'prometheus' if metrics_file.endswith('.prom') else 'json'
+        with open(metrics_file, 'w', encoding='utf-8') as f:
+            f.write(bot.metrics_report(fmt))
+        print(f"Run profile saved to {metrics_file}")
+
+def queue_main(argv: List[str]) -> None:
+    """`coordinator` and `worker` subcommands: enrich one input across many processes or nodes."""
+    import argparse
+    import socket
+    
+    parser = argparse.ArgumentParser(description='AI Lead Enrichment Bot - distributed work queue')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    
+    coordinator = subcommands.add_parser('coordinator', help='Split an input CSV into work items and collect the results')
+    coordinator.add_argument('input_file', help='Input CSV file with company names')
+    coordinator.add_argument('--queue', required=True, help='SQLite work queue file shared with the workers')
+    coordinator.add_argument('-o', '--output', help='Output file (optional); .parquet/.arrow/.feather write typed columnar output')
+    coordinator.add_argument('--item-size', type=int, default=DEFAULT_ITEM_SIZE, help='Input rows per work item')
+    coordinator.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS, help='Leases per work item before it is marked failed')
+    coordinator.add_argument('--chunksize', type=int, default=1000, help='Input rows read per chunk')
+    coordinator.add_argument('--poll-interval', type=float, default=5.0, help='Seconds between progress checks')
+    coordinator.add_argument('--no-wait', action='store_true', help='Only enqueue; run the coordinator again later to write the output')
+    
+    worker = subcommands.add_parser('worker', help='Lease work items from the queue and enrich them')
+    worker.add_argument('--queue', required=True, help='SQLite work queue file shared with the coordinator')
+    worker.add_argument('--worker-id', default=f"{socket.gethostname()}-{os.getpid()}", help='Name recorded on leased items')
+    worker.add_argument('--lease-seconds', type=float, default=DEFAULT_LEASE_SECONDS, help='Lease length; renewed while the item is in progress')
+    worker.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait when no work item is free')
+    _add_bot_arguments(worker)
+    
+    args = parser.parse_args(argv)
+    queue = WorkQueue(args.queue)
+    try:
+        if args.command == 'worker':
+            bot = _build_bot(args, worker)
+            try:
+                completed = bot.run_worker(queue, args.worker_id, workers=args.workers, batch_size=args.llm_batch_size,
+                                           lease_seconds=args.lease_seconds, poll_interval=args.poll_interval)
+            finally:
+                _finish_bot(bot)
+            print(f"\nWorker {args.worker_id} finished: {completed} work items completed.")
+            _print_run_report(bot, args.metrics_file)
+            return
+        
+        # The output columns come from the queue, as bound by the workers
+        bot = LeadEnrichmentBot()
+        bot.enqueue_csv(queue, args.input_file, item_size=args.item_size, chunksize=args.chunksize,
+                        max_attempts=args.max_attempts)
+        if args.no_wait:
+            print(f"\nEnqueued {args.input_file}: {queue.counts()}")
+            return
+        while not queue.finished():
+            logger.info(f"Queue progress: {queue.counts()}")
+            time.sleep(args.poll_interval)
+        output_file = args.output or os.path.splitext(args.input_file)[0] + '_enriched.csv'
+        total_rows = bot.export_queue(queue, output_file)
+        counts = queue.counts()
+        print(f"\nProcessing complete! Results saved to {output_file}")
+        print(f"Processed {total_rows} companies ({counts['done']} work items done, {counts['failed']} failed).")
+    finally:
+        queue.close()
 
 def main():
     import argparse
+    import sys
     
-    parser = argparse.ArgumentParser(description='AI Lead Enrichment Bot')
-    parser.add_argument('input_file', help='Input CSV file with company names')
-    parser.add_argument('-o', '--output', help='Output CSV file (optional)')
-    parser.add_argument('--openai-key', help='OpenAI API key')
-    parser.add_argument('--gemini-key', help='Google Gemini API key')
+    if sys.argv[1:2] and sys.argv[1] in QUEUE_COMMANDS:
+        return queue_main(sys.argv[1:])
+    
+    parser = argparse.ArgumentParser(description='AI Lead Enrichment Bot',
+                                     epilog=f"Distributed mode: {' | '.join(QUEUE_COMMANDS)} subcommands (see '<command> --help')")
+    parser.add_argument('input_file', help='Input CSV, Parquet or Arrow file with company names')
+    parser.add_argument('-o', '--output', help='Output file (optional); .parquet/.arrow/.feather write typed columnar output')
+    parser.add_argument('--lead-store', help='Merge results into this lead store (.sqlite/.db file or Parquet dataset directory) instead of writing an output file')
+    parser.add_argument('--max-age-days', type=float, default=30, help='With --lead-store, re-enrich leads last enriched longer ago than this')
+    parser.add_argument('--change-threshold', type=float, default=DEFAULT_CHANGE_THRESHOLD, help='With --lead-store, homepage similarity (0-1) at or above which a stale lead keeps its stored summary')
+    parser.add_argument('--dedupe', action='store_true', help='Enrich duplicate and near-duplicate company names only once')
+    parser.add_argument('--dedupe-threshold', type=float, default=0.92, help='Similarity (0-1) at which two names count as the same company')
+    parser.add_argument('--resume', action='store_true', help='Continue an interrupted run from its checkpoint')
+    parser.add_argument('--chunksize', type=int, default=1000, help='Input rows read per chunk')
+    parser.add_argument('--warm-cache', action='store_true', help='Only prefetch search results and homepages into the cache, then exit')
+    _add_bot_arguments(parser)
     
     args = parser.parse_args()
+    bot = _build_bot(args, parser)
     
-    bot = LeadEnrichmentBot(
-        openai_api_key=args.openai_key or os.getenv('OPENAI_API_KEY'),
-        gemini_api_key=args.gemini_key or os.getenv('GEMINI_API_KEY')
-    )
+    if args.warm_cache:
+        if bot.cache is None:
+            parser.error('--warm-cache cannot be combined with --no-cache')
+        company_names = bot.iter_csv_companies(args.input_file, chunksize=args.chunksize)
+        try:
+            seen, reachable = bot.warm_cache(company_names, workers=args.workers)
+        finally:
+            _finish_bot(bot)
+        print(f"\nCache warmed for {seen} companies ({reachable} homepages reachable).")
+        return
+    
+    if args.lead_store:
+        store = open_lead_store(args.lead_store)
+        try:
+            stats = bot.upsert_leads(args.input_file, store, max_age_days=args.max_age_days, workers=args.workers,
+                                     chunksize=args.chunksize, batch_size=args.llm_batch_size,
+                                     change_threshold=args.change_threshold)
+        finally:
+            store.close()
+            _finish_bot(bot)
+        print(f"\nLead store {args.lead_store} updated: {stats['upserted']} leads enriched and merged, "
+              f"{stats['input_rows'] - stats['upserted'] - stats['failed']} rows already fresh or duplicate, "
+              f"{stats['failed']} failed.")
+        _print_run_report(bot, args.metrics_file)
+        return
     
-    output_file = args.output or args.input_file.replace('.csv', '_enriched.csv')
-    results_df = bot.process_csv(args.input_file, output_file)
+    output_file = args.output or os.path.splitext(args.input_file)[0] + '_enriched.csv'
+    deduplicator = None
+    if args.dedupe:
+        deduplicator = bot.deduplicate_csv(args.input_file, chunksize=args.chunksize, threshold=args.dedupe_threshold)
+    try:
+        total_rows = bot.stream_csv(args.input_file, output_file, workers=args.workers,
+                                    resume=args.resume, chunksize=args.chunksize,
+                                    batch_size=args.llm_batch_size, deduplicator=deduplicator)
+    finally:
+        _finish_bot(bot)
     
     print(f"\nProcessing complete! Results saved to {output_file}")
-    print(f"Processed {len(results_df)} companies successfully.")
+    print(f"Processed {total_rows} companies successfully.")
+    if deduplicator is not None:
+        report = deduplicator.report()
+        print(f"Deduplication: {report['rows']} rows -> {report['groups']} companies, "
+              f"{report['enrichments_saved']} enrichment calls saved")
+    _print_run_report(bot, args.metrics_file)
 
 if __name__ == "__main__":
     main()
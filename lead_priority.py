@@ -0,0 +1,59 @@
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+QUALIFIED = 'llm'
+# Why a lead did not earn an LLM call, as written to the lead_tier column
+SKIP_NO_WEBSITE = 'skipped_no_website'
+SKIP_THIN_CONTENT = 'skipped_thin_content'
+SKIP_EXCLUDED_INDUSTRY = 'skipped_excluded_industry'
+SKIP_LOW_SCORE = 'skipped_low_score'
+# The homepage matches the one the stored summary was written from (lead store refreshes)
+SKIP_UNCHANGED = 'skipped_unchanged'
+DEFAULT_PRIORITY_WINDOW = 1000
+
+
+@dataclass
+class LeadPolicy:
+    """Decides, after the cheap pass, which leads get an LLM call and in what order.
+
+    A lead's score is its industry weight (default 1.0) scaled by the
+    classifier's confidence: weight * (0.5 + 0.5 * confidence). Leads without
+    a reachable website (no site found or no homepage text), with less than
+    `min_content_chars` of text, in an excluded industry or scoring below
+    `min_score` skip the LLM.
+    """
+
+    exclude_industries: List[str] = field(default_factory=list)
+    industry_weights: Dict[str, float] = field(default_factory=dict)
+    min_score: float = 0.0
+    min_content_chars: int = 0
+    require_website: bool = True
+
+    @classmethod
+    def from_file(cls, path: str) -> 'LeadPolicy':
+        """Load a policy from JSON, e.g. {"exclude_industries": ["Real Estate"], "industry_weights": {"Technology": 2}}."""
+        with open(path, 'r', encoding='utf-8') as f:
+            options = json.load(f)
+        unknown = set(options) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"{path} has unknown lead policy options: {', '.join(sorted(unknown))}")
+        return cls(**options)
+
+    def score(self, industry: str, confidence: float) -> float:
+        return round(self.industry_weights.get(industry, 1.0) * (0.5 + 0.5 * confidence), 3)
+
+    def evaluate(self, website: str, industry: str, confidence: float,
+                 website_content: str) -> Tuple[Optional[float], str]:
+        """Return (score, tier): tier is QUALIFIED or the reason the lead skips the LLM."""
+        if self.require_website and (not website or website in ('Unknown', 'Error') or not website_content):
+            return None, SKIP_NO_WEBSITE
+        if len(website_content or '') < self.min_content_chars:
+            return None, SKIP_THIN_CONTENT
+        if industry in self.exclude_industries:
+            return None, SKIP_EXCLUDED_INDUSTRY
+        score = self.score(industry, confidence)
+        if score < self.min_score:
+            return score, SKIP_LOW_SCORE
+        return score, QUALIFIED
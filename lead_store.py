@@ -0,0 +1,364 @@
+import calendar
+import glob
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from domain_resolver import normalize_company_name
+
+
+COLUMNAR_EXTENSIONS = {'.parquet': 'parquet', '.pq': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+# Typed schema of lead store rows on top of the output columns
+STORE_COLUMNS = ['company_key', 'company_name', 'website', 'industry', 'summary_from_llm',
+                 'automation_pitch_from_llm', 'enriched_at']
+# Homepage fingerprint and HTTP validators, so a refresh can tell whether the page changed
+CHANGE_COLUMNS = ['content_hash', 'content_simhash', 'etag', 'last_modified']
+STORE_COLUMNS += CHANGE_COLUMNS
+# Parquet part names: a 20-digit nanosecond sequence, or the second-resolution stamp of older versions
+PART_NAME = re.compile(r"part-(?:(\d{20})|(\d{8}T\d{6}))-")
+
+
+def store_key(company_name: str) -> str:
+    """Row key: the name without case, punctuation or legal suffix ('Slack, Inc.' -> 'slack').
+
+    Unlike the dedup key this keeps descriptor words, so 'Tech Data' and
+    'Data Labs' stay separate leads.
+    """
+    return normalize_company_name(company_name) or str(company_name)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet/Arrow files need pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def columnar_format(path: str) -> Optional[str]:
+    """'parquet' or 'arrow' for columnar file names, None for CSV and anything else."""
+    return COLUMNAR_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def output_schema(columns: List[str]):
+    pa = _pyarrow()
+    # Everything else is text
+    typed = {'enriched_at': pa.timestamp('s', tz='UTC'), 'lead_score': pa.float64()}
+    return pa.schema([pa.field(name, typed.get(name, pa.string())) for name in columns])
+
+
+def iter_columnar_companies(path: str, batch_size: int = 1000, skip_rows: int = 0) -> Iterator[str]:
+    """Yield the company_name column of a Parquet or Arrow file one record batch at a time."""
+    pa = _pyarrow()
+    if columnar_format(path) == 'parquet':
+        parquet_file = pa.parquet.ParquetFile(path)
+        if 'company_name' not in parquet_file.schema_arrow.names:
+            raise ValueError("Input must contain 'company_name' column")
+        batches = parquet_file.iter_batches(batch_size=batch_size, columns=['company_name'])
+    else:
+        table = pa.feather.read_table(path, memory_map=True)
+        if 'company_name' not in table.column_names:
+            raise ValueError("Input must contain 'company_name' column")
+        batches = table.select(['company_name']).to_batches(max_chunksize=batch_size)
+    for batch in batches:
+        names = batch.column(0).to_pylist()
+        if skip_rows >= len(names):
+            skip_rows -= len(names)
+            continue
+        yield from (str(name) for name in names[skip_rows:])
+        skip_rows = 0
+
+
+class ColumnarWriter:
+    """Writes output rows to a Parquet or Arrow file in row groups of `batch_rows`."""
+
+    def __init__(self, path: str, columns: List[str], batch_rows: int = 1000):
+        pa = _pyarrow()
+        self.path = path
+        self.columns = columns
+        self.batch_rows = batch_rows
+        self.schema = output_schema(columns)
+        self._rows: List[Dict[str, object]] = []
+        if columnar_format(path) == 'parquet':
+            self._writer = pa.parquet.ParquetWriter(path, self.schema, compression='zstd')
+        else:
+            self._sink = pa.OSFile(path, 'wb')
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+
+    def write(self, row: Dict[str, object]) -> None:
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        pa = _pyarrow()
+        columns = {name: [row.get(name) for row in self._rows] for name in self.columns}
+        self._writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+        self._rows = []
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+        if columnar_format(self.path) == 'arrow':
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class LeadStore:
+    """Enriched leads keyed by normalized company name (`store_key`), so repeated runs only refresh the delta.
+
+    Subclasses store rows; `stale_names` decides which input names need
+    enrichment and `upsert` merges fresh rows over older ones.
+    """
+
+    def enriched_at(self, keys: List[str]) -> Dict[str, float]:
+        """Epoch seconds of the last enrichment of each known key."""
+        raise NotImplementedError
+
+    def upsert(self, rows: List[Dict[str, str]]) -> int:
+        raise NotImplementedError
+
+    def previous(self, company_name: str) -> Optional[Dict[str, object]]:
+        """The stored row for a company's store key, or None if it was never enriched."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def stale_names(self, company_names: Iterable[str], max_age_seconds: float,
+                    batch_size: int = 1000) -> Iterator[str]:
+        """Yield each input company that is missing from the store or older than `max_age_seconds`.
+
+        Spellings sharing a store key are yielded once.
+        """
+        cutoff = time.time() - max_age_seconds
+        seen = set()
+        batch: Dict[str, str] = {}
+
+        def flush():
+            known = self.enriched_at(list(batch))
+            for key, name in batch.items():
+                if known.get(key, 0) < cutoff:
+                    yield name
+            batch.clear()
+
+        for name in company_names:
+            key = store_key(str(name))
+            if key in seen:
+                continue
+            seen.add(key)
+            batch[key] = str(name)
+            if len(batch) >= batch_size:
+                yield from flush()
+        yield from flush()
+
+    @staticmethod
+    def _store_row(row: Dict[str, str], enriched_at: float) -> Dict[str, object]:
+        stored = {name: row.get(name, '') for name in STORE_COLUMNS}
+        stored['company_key'] = store_key(row['company_name'])
+        stored['enriched_at'] = enriched_at
+        return stored
+
+
+class SqliteLeadStore(LeadStore):
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS leads ('
+            ' company_key TEXT PRIMARY KEY, company_name TEXT NOT NULL, website TEXT, industry TEXT,'
+            ' summary_from_llm TEXT, automation_pitch_from_llm TEXT, enriched_at REAL NOT NULL,'
+            ' content_hash TEXT, content_simhash TEXT, etag TEXT, last_modified TEXT)'
+        )
+        # Stores created before change detection lack its columns
+        existing = {row[1] for row in self._conn.execute('PRAGMA table_info(leads)')}
+        for name in CHANGE_COLUMNS:
+            if name not in existing:
+                self._conn.execute(f'ALTER TABLE leads ADD COLUMN {name} TEXT')
+        self._conn.commit()
+
+    def enriched_at(self, keys: List[str]) -> Dict[str, float]:
+        known = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f'SELECT company_key, enriched_at FROM leads WHERE company_key IN ({placeholders})', chunk
+                ).fetchall()
+            known.update(rows)
+        return known
+
+    def upsert(self, rows: List[Dict[str, str]]) -> int:
+        now = time.time()
+        stored = [self._store_row(row, now) for row in rows]
+        columns = ', '.join(STORE_COLUMNS)
+        updates = ', '.join(f'{name} = excluded.{name}' for name in STORE_COLUMNS if name != 'company_key')
+        with self._lock:
+            self._conn.executemany(
+                f'INSERT INTO leads ({columns}) VALUES ({", ".join("?" * len(STORE_COLUMNS))})'
+                f' ON CONFLICT(company_key) DO UPDATE SET {updates}',
+                [tuple(row[name] for name in STORE_COLUMNS) for row in stored],
+            )
+            self._conn.commit()
+        return len(stored)
+
+    def previous(self, company_name: str) -> Optional[Dict[str, object]]:
+        key = store_key(company_name)
+        with self._lock:
+            cursor = self._conn.execute(f'SELECT {", ".join(STORE_COLUMNS)} FROM leads WHERE company_key = ?', (key,))
+            row = cursor.fetchone()
+        return dict(zip(STORE_COLUMNS, row)) if row else None
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM leads').fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class ParquetLeadStore(LeadStore):
+    """A directory of Parquet files; each upsert adds one file and the newest row per key wins.
+
+    Only the key and timestamp columns are read to decide freshness; full rows
+    are loaded once, on the first `previous` lookup. `compact` rewrites the
+    dataset as a single file holding the latest row per key.
+    """
+
+    _sequence_lock = threading.Lock()
+    _last_sequence = 0
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._index: Optional[Dict[str, float]] = None
+        self._latest: Optional[Dict[str, Dict[str, object]]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _next_sequence(cls) -> int:
+        """Nanoseconds since the epoch, strictly increasing within the process even on a coarse clock."""
+        with cls._sequence_lock:
+            cls._last_sequence = max(time.time_ns(), cls._last_sequence + 1)
+            return cls._last_sequence
+
+    @staticmethod
+    def _sequence(path: str) -> int:
+        match = PART_NAME.match(os.path.basename(path))
+        if match is None:
+            return 0
+        if match.group(1):
+            return int(match.group(1))
+        return calendar.timegm(time.strptime(match.group(2), '%Y%m%dT%H%M%S')) * 10 ** 9
+
+    def _files(self) -> List[str]:
+        """Part files in write order, oldest first."""
+        return sorted(glob.glob(os.path.join(self.path, '*.parquet')), key=lambda path: (self._sequence(path), path))
+
+    def _write_part(self, table, sequence: int, suffix: str = '') -> None:
+        # The sequence orders the files; the random part avoids clashes between processes
+        name = f"part-{sequence:020d}-{uuid.uuid4().hex[:8]}{suffix}.parquet"
+        tmp_path = os.path.join(self.path, f".{name}.tmp")
+        _pyarrow().parquet.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, os.path.join(self.path, name))
+
+    def _load_index(self) -> Dict[str, float]:
+        if self._index is None:
+            pa = _pyarrow()
+            self._index = {}
+            for path in self._files():
+                table = pa.parquet.read_table(path, columns=['company_key', 'enriched_at'])
+                keys = table.column('company_key').to_pylist()
+                # Parquet has no seconds unit, so files come back in ms; normalise before reading epochs
+                stamps = table.column('enriched_at').cast(pa.timestamp('s', tz='UTC')).cast(pa.int64()).to_pylist()
+                for key, stamp in zip(keys, stamps):
+                    if stamp > self._index.get(key, -1):
+                        self._index[key] = float(stamp)
+        return self._index
+
+    def enriched_at(self, keys: List[str]) -> Dict[str, float]:
+        index = self._load_index()
+        return {key: index[key] for key in keys if key in index}
+
+    def upsert(self, rows: List[Dict[str, str]]) -> int:
+        if not rows:
+            return 0
+        pa = _pyarrow()
+        now = int(time.time())
+        stored = [self._store_row(row, now) for row in rows]
+        schema = output_schema(STORE_COLUMNS)
+        table = pa.Table.from_pydict({name: [row[name] for row in stored] for name in STORE_COLUMNS}, schema=schema)
+        self._write_part(table, self._next_sequence())
+        index = self._load_index()
+        for row in stored:
+            index[row['company_key']] = float(now)
+            if self._latest is not None:
+                self._latest[row['company_key']] = row
+        return len(stored)
+
+    def previous(self, company_name: str) -> Optional[Dict[str, object]]:
+        with self._lock:
+            if self._latest is None:
+                self._latest = {row['company_key']: row for row in self.read_latest().to_pylist()}
+        return self._latest.get(store_key(company_name))
+
+    @staticmethod
+    def _conform(table):
+        """Add columns missing from files written by older versions, as nulls, in STORE_COLUMNS order."""
+        schema = output_schema(STORE_COLUMNS)
+        for field in schema:
+            if field.name not in table.column_names:
+                table = table.append_column(field, _pyarrow().nulls(len(table), field.type))
+        return table.select(STORE_COLUMNS).cast(schema)
+
+    def read_latest(self):
+        """The whole store as one Arrow table with the newest row per key."""
+        pa = _pyarrow()
+        files = self._files()
+        if not files:
+            return output_schema(STORE_COLUMNS).empty_table()
+        table = pa.concat_tables(self._conform(pa.parquet.read_table(path)) for path in files)
+        # Later files win: keep the last occurrence of each key
+        table = table.append_column('_order', pa.array(range(len(table)), pa.int64()))
+        latest = table.group_by('company_key').aggregate([('_order', 'max')]).column('_order_max')
+        return table.take(sorted(latest.to_pylist())).drop(['_order'])
+
+    def compact(self) -> int:
+        """Rewrite the dataset as one file with a single row per key; returns the rows kept."""
+        old_files = self._files()
+        if len(old_files) <= 1:
+            return self.count()
+        table = self.read_latest()
+        # Take the place of the newest file folded in, so parts written meanwhile still sort after it
+        self._write_part(table, self._sequence(old_files[-1]), '-compacted')
+        for path in old_files:
+            os.remove(path)
+        return len(table)
+
+    def count(self) -> int:
+        return len(self._load_index())
+
+
+def open_lead_store(path: str) -> LeadStore:
+    """SQLite for *.sqlite / *.db files, otherwise a Parquet dataset directory."""
+    if os.path.splitext(path)[1].lower() in ('.sqlite', '.sqlite3', '.db'):
+        return SqliteLeadStore(path)
+    return ParquetLeadStore(path)
@@ -0,0 +1,63 @@
+import json
+import re
+from typing import Dict, List, Tuple
+
+from structured_output import AnalysisValidationError, validate_analysis
+
+
+BATCH_INSTRUCTIONS = """
+Analyze each company in the JSON array below. For every company provide:
+- "summary": a concise 2-3 sentence summary of what the company does
+- "pitch": a 2-3 sentence custom AI automation pitch that QF Innovate could offer them
+
+Keep responses professional and focused on business value.
+Respond with ONLY a JSON array holding one object per company, in any order:
+[{"id": <id from the input>, "summary": "...", "pitch": "..."}]
+
+Companies:
+"""
+
+
+def build_batch_prompt(items: List[Tuple[str, str, str]]) -> str:
+    """Pack (company_name, industry, context) tuples into one prompt, ids matching list positions.
+
+    The context is used as given: callers have already fitted it to the prompt budget.
+    """
+    companies = [
+        {'id': idx, 'company': name, 'industry': industry, 'website_content': content}
+        for idx, (name, industry, content) in enumerate(items)
+    ]
+    return BATCH_INSTRUCTIONS + json.dumps(companies, ensure_ascii=False)
+
+
+def _extract_json_array(text: str) -> str:
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    start, end = text.find('['), text.rfind(']')
+    if start == -1 or end <= start:
+        raise ValueError("No JSON array in batch response")
+    return text[start:end + 1]
+
+
+def parse_batch_response(text: str, count: int) -> Dict[int, Tuple[str, str]]:
+    """Return {id: (summary, pitch)} for every well-formed item; anything else is left out."""
+    try:
+        items = json.loads(_extract_json_array(text))
+    except ValueError:
+        return {}
+
+    parsed = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        idx = item.get('id')
+        if isinstance(idx, str) and idx.isdigit():
+            idx = int(idx)
+        if not isinstance(idx, int) or not 0 <= idx < count or idx in parsed:
+            continue
+        try:
+            parsed[idx] = validate_analysis(item)
+        except AnalysisValidationError:
+            continue
+    return parsed
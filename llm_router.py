@@ -0,0 +1,209 @@
+import asyncio
+import contextvars
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderHealth:
+    """Recent latency and error rate of one LLM provider."""
+
+    def __init__(self, window: int = 200):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+
+    def record(self, seconds: Optional[float], ok: bool) -> None:
+        self.calls += 1
+        self.outcomes.append(ok)
+        if not ok:
+            self.errors += 1
+        elif seconds is not None:
+            self.latencies.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        p50, p95 = self.percentile(0.50), self.percentile(0.95)
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'recent_error_rate': round(self.error_rate, 3),
+            'p50_seconds': round(p50, 3) if p50 is not None else None,
+            'p95_seconds': round(p95, 3) if p95 is not None else None,
+        }
+
+
+class LLMRouter:
+    """Sends each LLM call to the healthiest provider, hedging and failing over to the others.
+
+    If the primary has not answered within its recent p95 latency (clamped to
+    [`min_hedge_delay`, `max_hedge_delay`]), the next provider is asked too and
+    the first successful answer wins. An error fails over immediately. Providers
+    whose recent error rate exceeds `max_error_rate` drop to the back of the line.
+
+    `call` takes `attempt(provider)`, a function that does the whole call for
+    one provider (prompt, request, parsing) and raises on failure. The attempt
+    is not timed as a whole: callers `record` each real provider request, so
+    cache hits and local rate-limit waits never shrink the hedge delay.
+    """
+
+    def __init__(self, providers: List[str], hedge: bool = True, hedge_quantile: float = 0.95,
+                 initial_hedge_delay: float = 10.0, min_hedge_delay: float = 0.5,
+                 max_hedge_delay: float = 30.0, min_samples: int = 20,
+                 max_error_rate: float = 0.5, metrics=None, max_workers: int = 32):
+        self.providers = list(providers)
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.metrics = metrics
+        self.health = {provider: ProviderHealth() for provider in self.providers}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._max_workers = max_workers
+
+    def order(self) -> List[str]:
+        """Providers in the order they should be tried: configured order, unhealthy ones last."""
+        with self._lock:
+            unhealthy = {p for p in self.providers if self.health[p].error_rate > self.max_error_rate}
+        return sorted(self.providers, key=lambda p: p in unhealthy)
+
+    def primary(self) -> Optional[str]:
+        order = self.order()
+        return order[0] if order else None
+
+    def hedge_delay(self, provider: str) -> float:
+        with self._lock:
+            health = self.health[provider]
+            if len(health.latencies) < self.min_samples:
+                return self.initial_hedge_delay
+            delay = health.percentile(self.hedge_quantile)
+        return max(self.min_hedge_delay, min(self.max_hedge_delay, delay))
+
+    def record(self, provider: str, seconds: Optional[float], ok: bool) -> None:
+        """Book one provider request; `seconds` is None when it should not count towards the hedge delay."""
+        if provider not in self.health:
+            return
+        with self._lock:
+            self.health[provider].record(seconds, ok)
+        if self.metrics is not None and not ok:
+            self.metrics.increment(f'llm_failures_{provider}')
+
+    def _increment(self, name: str) -> None:
+        if self.metrics is not None:
+            self.metrics.increment(name)
+
+    def _submit(self, attempt, provider: str):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='llm')
+        # Each attempt runs in a copy of the caller's context so per-row timings still land on the row
+        return self._executor.submit(contextvars.copy_context().run, attempt, provider)
+
+    def call(self, attempt):
+        order = self.order()
+        if not order:
+            raise RuntimeError("No LLM provider configured")
+        if len(order) == 1:
+            return attempt(order[0])
+
+        waiting = list(order)
+        running = {}
+        last_error = None
+        while True:
+            if not running:
+                if not waiting:
+                    raise last_error
+                provider = waiting.pop(0)
+                running[self._submit(attempt, provider)] = provider
+            timeout = self.hedge_delay(running[next(iter(running))]) if self.hedge and waiting else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # The primary is past its usual latency, so ask the next provider as well
+                provider = waiting.pop(0)
+                self._increment('llm_hedges')
+                logger.debug(f"Hedging LLM call to {provider} after {timeout:.2f}s")
+                running[self._submit(attempt, provider)] = provider
+                continue
+            for future in done:
+                provider = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    self._increment('llm_failovers')
+                    logger.warning(f"{provider} call failed ({e}); failing over")
+                    continue
+                if provider != order[0]:
+                    self._increment('llm_fallback_wins')
+                # Losing sync calls cannot be interrupted; their results are simply dropped
+                return result
+
+    async def acall(self, attempt):
+        """`call` for coroutines: `attempt(provider)` is async and losing calls are cancelled."""
+        order = self.order()
+        if not order:
+            raise RuntimeError("No LLM provider configured")
+        if len(order) == 1:
+            return await attempt(order[0])
+
+        waiting = list(order)
+        running = {}
+        last_error = None
+        try:
+            while True:
+                if not running:
+                    if not waiting:
+                        raise last_error
+                    provider = waiting.pop(0)
+                    running[asyncio.ensure_future(attempt(provider))] = provider
+                timeout = self.hedge_delay(running[next(iter(running))]) if self.hedge and waiting else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    provider = waiting.pop(0)
+                    self._increment('llm_hedges')
+                    logger.debug(f"Hedging LLM call to {provider} after {timeout:.2f}s")
+                    running[asyncio.ensure_future(attempt(provider))] = provider
+                    continue
+                for task in done:
+                    provider = running.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        last_error = e
+                        self._increment('llm_failovers')
+                        logger.warning(f"{provider} call failed ({e}); failing over")
+                        continue
+                    if provider != order[0]:
+                        self._increment('llm_fallback_wins')
+                    return result
+        finally:
+            for task in running:
+                task.cancel()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {provider: health.snapshot() for provider, health in self.health.items()}
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,56 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from industry_classifier import IndustryClassifier
+from web_page import MAX_TEXT_CHARS, parse_html
+
+
+# Per-process state, built once by the pool initializer
+_classifier: Optional[IndustryClassifier] = None
+_max_chars = MAX_TEXT_CHARS
+
+
+def _init_worker(taxonomy: Optional[Dict[str, List[str]]], max_chars: int) -> None:
+    global _classifier, _max_chars
+    _classifier = IndustryClassifier(taxonomy)
+    _max_chars = max_chars
+
+
+def parse_and_classify(content: bytes, encoding: Optional[str] = None) -> Tuple[str, str, str, float]:
+    """Return (meta description, cleaned text, industry, confidence) for raw homepage bytes."""
+    meta_description, text = parse_html(content, _max_chars, encoding=encoding)
+    classifier = _classifier or IndustryClassifier()
+    industry, confidence = classifier.classify(meta_description + ' ' + text[:1000])
+    return meta_description, text, industry, confidence
+
+
+class ParsePool:
+    """Process pool for the CPU-bound part of a fetch: HTML parsing, text cleaning and industry scoring.
+
+    Raw page bytes go to a worker once; only the short extracted text and the
+    classification come back, so the I/O threads (or event loop) never hold
+    the GIL for parsing. Workers are spawned, not forked, because the parent
+    is full of threads.
+    """
+
+    def __init__(self, processes: Optional[int] = None, taxonomy: Optional[Dict[str, List[str]]] = None,
+                 max_chars: int = MAX_TEXT_CHARS):
+        self.processes = processes or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(taxonomy, max_chars),
+        )
+
+    def parse(self, content: bytes, encoding: Optional[str] = None) -> Tuple[str, str, str, float]:
+        return self._executor.submit(parse_and_classify, content, encoding).result()
+
+    async def aparse(self, content: bytes, encoding: Optional[str] = None) -> Tuple[str, str, str, float]:
+        return await asyncio.wrap_future(self._executor.submit(parse_and_classify, content, encoding))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,108 @@
+import math
+import re
+from collections import Counter
+from typing import List, Tuple
+
+
+DEFAULT_TOKEN_BUDGET = 400
+PASSAGE_CHARS = 320
+MIN_PASSAGE_CHARS = 40
+# Words that tend to appear where a homepage says what the company actually does
+BUSINESS_CUES = (
+    'we', 'our', 'company', 'about', 'mission', 'founded', 'provide', 'provides', 'offer', 'offers',
+    'build', 'builds', 'help', 'helps', 'platform', 'product', 'products', 'service', 'services',
+    'solution', 'solutions', 'customers', 'clients', 'businesses', 'teams', 'industry', 'leading',
+    'software', 'technology', 'manufacturing', 'healthcare', 'retail', 'marketplace', 'agency',
+)
+# Running prose is full of these; menus and keyword lists ("About Products Careers") are not
+FUNCTION_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'of', 'to', 'for', 'with', 'in', 'on', 'at', 'by', 'from',
+    'is', 'are', 'was', 'be', 'that', 'which', 'who', 'their', 'its', 'into', 'across', 'since',
+}
+# Cookie banners, auth prompts and legal footers that survive tag stripping
+BOILERPLATE = re.compile(
+    r'cookie|privacy|accept all|javascript|sign in|log in|sign up|subscribe|newsletter|'
+    r'all rights reserved|copyright|terms of (use|service)|skip to (main )?content',
+    re.IGNORECASE,
+)
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_WORD = re.compile(r"[a-z][a-z0-9'-]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Same rough 4-characters-per-token estimate the rate limiter uses."""
+    return len(text) // 4
+
+
+def split_passages(text: str, max_chars: int = PASSAGE_CHARS) -> List[str]:
+    """Split text into sentences, merging fragments shorter than MIN_PASSAGE_CHARS and cutting overlong ones."""
+    passages, current = [], ''
+    for sentence in _SENTENCE_END.split(text.strip()):
+        current = f"{current} {sentence}".strip()
+        while len(current) > max_chars:
+            cut = current.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            passages.append(current[:cut].strip())
+            current = current[cut:].strip()
+        if len(current) >= MIN_PASSAGE_CHARS:
+            passages.append(current)
+            current = ''
+    if current:
+        passages.append(current)
+    return passages
+
+
+def rank_passages(passages: List[str]) -> List[Tuple[float, int]]:
+    """(score, index) pairs, best first.
+
+    The score is the TF-IDF cosine against the business cues, scaled down for
+    text that does not read like prose (navigation, keyword lists) and
+    penalised for boilerplate phrases.
+    """
+    docs = [Counter(_WORD.findall(p.lower())) for p in passages]
+    df = Counter(word for doc in docs for word in doc)
+    n = len(docs)
+    idf = {word: math.log((1 + n) / (1 + count)) + 1.0 for word, count in df.items()}
+    query = {cue: idf[cue] for cue in BUSINESS_CUES if cue in idf}
+    query_norm = math.sqrt(sum(w * w for w in query.values())) or 1.0
+
+    ranked = []
+    for idx, (passage, doc) in enumerate(zip(passages, docs)):
+        weights = {word: (1 + math.log(tf)) * idf[word] for word, tf in doc.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        score = sum(weights[word] * q for word, q in query.items() if word in weights) / (norm * query_norm)
+        words = sum(doc.values()) or 1
+        score *= min(1.0, sum(doc[word] for word in FUNCTION_WORDS) / words / 0.15)
+        score -= 0.5 * len(BOILERPLATE.findall(passage))
+        ranked.append((score, idx))
+    ranked.sort(key=lambda item: (-item[0], item[1]))
+    return ranked
+
+
+def build_context(text: str, token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """The most business-relevant passages of `text` that fit `token_budget`, in page order.
+
+    Text within the budget passes through unchanged. Longer pages keep their
+    best-scoring passages, then fill the remaining budget with the other
+    passages that are not boilerplate; nothing is ever padded up to the budget.
+    """
+    if not text:
+        return ''
+    if estimate_tokens(text) <= token_budget:
+        return text
+    passages = split_passages(text)
+    ranked = rank_passages(passages)
+    # Relevant passages first, then the rest as backfill; boilerplate is only sent when it also scored well
+    order = [idx for score, idx in ranked if score > 0]
+    order += [idx for score, idx in ranked if score <= 0 and not BOILERPLATE.search(passages[idx])]
+    chosen, used = [], 0
+    for idx in order:
+        cost = estimate_tokens(passages[idx]) + 1
+        if used + cost > token_budget:
+            continue
+        chosen.append(idx)
+        used += cost
+    if not chosen:
+        # No passage fits on its own; fall back to the start of the page rather than sending no context
+        return text[:token_budget * 4]
+    return ' '.join(passages[idx] for idx in sorted(chosen))
@@ -0,0 +1,45 @@
+import sys
+from typing import Dict, Iterator, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Low-cardinality columns whose values are shared between rows rather than copied
+INTERNED_COLUMNS = {'industry'}
+
+
+class ResultTable:
+    """Output rows stored column by column: one list per column instead of one dict per row.
+
+    A 500k-row run keeps a handful of lists rather than 500k dicts, and
+    repeated values such as industries are interned so rows share them.
+    """
+
+    __slots__ = ('columns', '_data')
+
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        self._data: Dict[str, List[str]] = {name: [] for name in self.columns}
+
+    def append(self, row: Dict[str, str]) -> None:
+        for name in self.columns:
+            value = row.get(name, '')
+            if name in INTERNED_COLUMNS and isinstance(value, str):
+                value = sys.intern(value)
+            self._data[name].append(value)
+
+    def __len__(self) -> int:
+        # The last column is appended last, so its length only counts complete rows even mid-append
+        return len(self._data[self.columns[-1]]) if self.columns else 0
+
+    def column(self, name: str) -> List[str]:
+        return self._data[name]
+
+    def iter_rows(self, start: int = 0) -> Iterator[Dict[str, str]]:
+        for idx in range(start, len(self)):
+            yield {name: self._data[name][idx] for name in self.columns}
+
+    def to_frame(self) -> 'pd.DataFrame':
+        import pandas as pd
+        return pd.DataFrame({name: values[:len(self)] for name, values in self._data.items()}, columns=self.columns)
@@ -0,0 +1,155 @@
+import contextvars
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+MAX_SAMPLES = 5000
+
+
+class StageStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.samples: List[float] = []
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        for idx, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[idx] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        # Reservoir sampling keeps percentiles honest with bounded memory
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot = random.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = seconds
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'total_seconds': round(self.total, 4),
+            'mean_seconds': round(self.total / self.count, 4) if self.count else 0.0,
+            'p50_seconds': round(self.percentile(0.50), 4),
+            'p95_seconds': round(self.percentile(0.95), 4),
+            'histogram': {
+                **{f"le_{bound}": n for bound, n in zip(LATENCY_BUCKETS, self.buckets)},
+                'le_inf': self.buckets[-1],
+            },
+        }
+
+
+class RunMetrics:
+    """Thread-safe per-stage timers and counters for one enrichment run."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.stages: Dict[str, StageStats] = defaultdict(StageStats)
+        self.counters = Counter()
+        self.errors = Counter()
+        self._lock = threading.Lock()
+        # A context variable rather than thread-local so concurrent asyncio tasks each get their own row
+        self._row_timings = contextvars.ContextVar('row_timings', default=None)
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage].observe(seconds)
+        row_timings = self._row_timings.get()
+        if row_timings is not None:
+            row_timings[stage] = row_timings.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def track_row(self):
+        """Collect the stage timings recorded on this thread (or asyncio task) into a dict for the current row."""
+        timings: Dict[str, float] = {}
+        token = self._row_timings.set(timings)
+        try:
+            yield timings
+        finally:
+            self._row_timings.reset(token)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def record_error(self, stage: str, error: Exception) -> None:
+        with self._lock:
+            self.errors[f"{stage}:{type(error).__name__}"] += 1
+
+    def report(self, cache_stats: Optional[Dict] = None, llm_providers: Optional[Dict] = None) -> Dict:
+        with self._lock:
+            report = {
+                'elapsed_seconds': round(time.time() - self.started_at, 3),
+                'stages': {stage: stats.summary() for stage, stats in sorted(self.stages.items())},
+                'counters': dict(self.counters),
+                'errors': dict(self.errors),
+            }
+        if cache_stats is not None:
+            report['cache'] = cache_stats
+        if llm_providers:
+            report['llm_providers'] = llm_providers
+        return report
+
+    def to_json(self, cache_stats: Optional[Dict] = None, llm_providers: Optional[Dict] = None) -> str:
+        return json.dumps(self.report(cache_stats, llm_providers), indent=2)
+
+    def to_prometheus(self, cache_stats: Optional[Dict] = None, llm_providers: Optional[Dict] = None,
+                      prefix: str = 'lead_enrichment') -> str:
+        report = self.report(cache_stats, llm_providers)
+        lines = [f"# TYPE {prefix}_stage_seconds histogram"]
+        for stage, stats in report['stages'].items():
+            cumulative = 0
+            for bucket, count in stats['histogram'].items():
+                cumulative += count
+                bound = '+Inf' if bucket == 'le_inf' else bucket[3:]
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {stats["total_seconds"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        # Each counter is its own family, so each needs its own TYPE line
+        for name, value in sorted(report['counters'].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f'{prefix}_{name}_total {value}')
+        lines.append(f"# TYPE {prefix}_errors_total counter")
+        for key, value in sorted(report['errors'].items()):
+            stage, error_type = key.split(':', 1)
+            lines.append(f'{prefix}_errors_total{{stage="{stage}",type="{error_type}"}} {value}')
+        cache = sorted(report.get('cache', {}).items())
+        for field, family in (('hits', 'cache_hits_total'), ('misses', 'cache_misses_total')):
+            if cache:
+                lines.append(f"# TYPE {prefix}_{family} counter")
+            for layer, stats in cache:
+                lines.append(f'{prefix}_{family}{{layer="{layer}"}} {stats[field]}')
+        providers = sorted(report.get('llm_providers', {}).items())
+        for field, family in (('recent_error_rate', 'llm_recent_error_rate'), ('p95_seconds', 'llm_p95_seconds')):
+            samples = [(provider, stats[field]) for provider, stats in providers if stats[field] is not None]
+            if samples:
+                lines.append(f"# TYPE {prefix}_{family} gauge")
+            for provider, value in samples:
+                lines.append(f'{prefix}_{family}{{provider="{provider}"}} {value}')
+        return '\n'.join(lines) + '\n'
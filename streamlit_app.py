@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
+import hashlib
 import io
 import os
+from enrichment_job import EnrichmentJob
 from lead_enrichment_bot import LeadEnrichmentBot
 import time
 
@@ -40,6 +42,14 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource(show_spinner=False)
+def get_bot(openai_key, gemini_key):
+    """One bot per API key pair, reused across reruns so its connection pools and cache stay warm."""
+    return LeadEnrichmentBot(
+        openai_api_key=openai_key if openai_key else None,
+        gemini_api_key=gemini_key if gemini_key else None
+    )
+
 def main():
     st.markdown("""
     <div class="main-header">
@@ -57,6 +67,10 @@ def main():
         openai_key = st.text_input("OpenAI API Key", type="password", help="Optional: For GPT-powered analysis")
         gemini_key = st.text_input("Google Gemini API Key", type="password", help="Optional: Free alternative to OpenAI")
         
+        st.subheader("Performance")
+        workers = st.slider("Companies in parallel", min_value=1, max_value=16, value=4,
+                            help="How many companies are looked up at the same time")
+        
  
         st.info("""
         **API Information:**
@@ -114,10 +128,16 @@ def main():
                 
             
                 if st.button("🚀 Start Enrichment Process", type="primary", use_container_width=True):
-                    process_companies(df, openai_key, gemini_key)
+                    job_key = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+                    process_companies(df, openai_key, gemini_key, workers, job_key)
                     
             except Exception as e:
                 st.error(f"❌ Error reading CSV: {str(e)}")
+        
+        # The job lives in the session, so reruns (widget clicks) show its progress instead of restarting it
+        job = st.session_state.get('enrichment_job')
+        if job is not None:
+            show_job(job)
     
     with col2:
         st.header("📊 Process Overview")
@@ -143,100 +163,101 @@ def main():
         
         for field in output_fields:
             st.write(f"• **{field}**")
+    
+    job = st.session_state.get('enrichment_job')
+    if job is not None and job.running:
+        # Poll the background job: redraw the page with the rows finished so far
+        time.sleep(1)
+        st.rerun()
 
-def process_companies(df, openai_key, gemini_key):
- 
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+def process_companies(df, openai_key, gemini_key, workers=4, job_key=None):
+    """Start enriching `df` in the background; progress and results are drawn by show_job on each rerun."""
+    job = st.session_state.get('enrichment_job')
+    if job is not None and job.running:
+        if job.key == job_key:
+            st.info("ℹ️ This file is already being enriched")
+            return
+        job.cancel()
     
-    try:
-        bot = LeadEnrichmentBot(
-            openai_api_key=openai_key if openai_key else None,
-            gemini_api_key=gemini_key if gemini_key else None
-        )
-        
-   
-        results = []
-        total_companies = len(df)
-        
-        status_text.text("🔄 Starting enrichment process...")
-        
-        for idx, row in df.iterrows():
-            company_name = row['company_name']
-            
+    bot = get_bot(openai_key, gemini_key)
+    st.session_state['enrichment_job'] = EnrichmentJob(bot, df['company_name'].tolist(), workers=workers,
+                                                       key=job_key).start()
 
-            progress = (idx + 1) / total_companies
-            progress_bar.progress(progress)
-            status_text.text(f"🔄 Processing {idx + 1}/{total_companies}: {company_name}")
-            
-            try:
-                company_data = bot.enrich_company(company_name)
-                
-                results.append({
-                    'company_name': company_data.name,
-                    'website': company_data.website,
-                    'industry': company_data.industry,
-                    'summary_from_llm': company_data.summary,
-                    'automation_pitch_from_llm': company_data.automation_pitch
-                })
-                
-            except Exception as e:
-                st.warning(f"⚠️ Error processing {company_name}: {str(e)}")
-                results.append({
-                    'company_name': company_name,
-                    'website': 'Error',
-                    'industry': 'Error',
-                    'summary_from_llm': f'Error: {str(e)}',
-                    'automation_pitch_from_llm': 'Unable to generate pitch'
-                })
+def format_eta(seconds):
+    if seconds is None:
+        return "estimating..."
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+def show_job(job):
+    results_df = job.to_frame()
+    
+    if job.running:
+        st.subheader("🔄 Enrichment in Progress")
+        st.progress(job.done / job.total if job.total else 1.0)
+        status = "⏹️ Stopping after the companies in flight..." if job.cancelled else f"🔄 Processed {job.done}/{job.total} companies"
+        st.text(status)
         
-     
-        progress_bar.progress(1.0)
-        status_text.text("✅ Enrichment process completed!")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Companies Processed", f"{job.done}/{job.total}")
+        with col2:
+            st.metric("Throughput", f"{job.rows_per_second() * 60:.1f}/min")
+        with col3:
+            st.metric("ETA", format_eta(job.eta_seconds()))
         
- 
-        results_df = pd.DataFrame(results)
+        if not job.cancelled and st.button("⏹️ Stop Enrichment", use_container_width=True):
+            job.cancel()
         
+        st.dataframe(results_df, use_container_width=True)
+        return
+    
+    if job.error:
+        st.error(f"❌ Error during processing: {job.error}")
+    elif job.cancelled and job.done < job.total:
+        st.warning(f"⏹️ Enrichment stopped after {job.done} of {job.total} companies")
+    else:
         st.markdown("""
         <div class="success-box">
             <h4>🎉 Enrichment Complete!</h4>
             <p>Your company data has been successfully enriched with AI-powered insights.</p>
         </div>
         """, unsafe_allow_html=True)
-        
-        st.subheader("📊 Enriched Results")
-        st.dataframe(results_df, use_container_width=True)
-        
-        csv_buffer = io.StringIO()
-        results_df.to_csv(csv_buffer, index=False)
-        csv_data = csv_buffer.getvalue()
-        
-        st.download_button(
-            label="📥 Download Enriched CSV",
-            data=csv_data,
-            file_name=f"enriched_companies_{int(time.time())}.csv",
-            mime="text/csv",
-            type="primary",
-            use_container_width=True
-        )
-        
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric("Companies Processed", len(results_df))
-        
-        with col2:
-            successful = len([r for r in results if r['website'] != 'Error'])
-            st.metric("Successful Enrichments", successful)
-        
-        with col3:
-            success_rate = (successful / len(results_df)) * 100
-            st.metric("Success Rate", f"{success_rate:.1f}%")
-        
-    except Exception as e:
-        st.error(f"❌ Error during processing: {str(e)}")
-        status_text.text("❌ Process failed")
+    
+    if results_df.empty:
+        return
+    
+    st.subheader("📊 Enriched Results")
+    st.dataframe(results_df, use_container_width=True)
+    
+    csv_buffer = io.StringIO()
+    results_df.to_csv(csv_buffer, index=False)
+    csv_data = csv_buffer.getvalue()
+    
+    st.download_button(
+        label="📥 Download Enriched CSV",
+        data=csv_data,
+        file_name=f"enriched_companies_{int(job.finished_at or time.time())}.csv",
+        mime="text/csv",
+        type="primary",
+        use_container_width=True
+    )
+    
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Companies Processed", len(results_df))
+    
+    with col2:
+        successful = int((results_df['website'] != 'Error').sum())
+        st.metric("Successful Enrichments", successful)
+    
+    with col3:
+        success_rate = (successful / len(results_df)) * 100
+        st.metric("Success Rate", f"{success_rate:.1f}%")
+    
+    st.caption(f"⏱️ {job.done} companies in {job.elapsed():.0f}s ({job.rows_per_second() * 60:.1f}/min)")
 
 def show_demo():
     """Show demo results"""
@@ -266,7 +287,7 @@ st.markdown("---")
 st.markdown("""
 <div style="text-align: center; padding: 2rem; color: #666;">
     <p>🤖 AI Lead Enrichment Bot | Built for QF Innovate Internship Task</p>
-    <p>Powered by OpenAI, Google Gemini, and Beautiful Soup</p>
+    <p>Powered by OpenAI, Google Gemini, and lxml</p>
 </div>
 """, unsafe_allow_html=True)
 
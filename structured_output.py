@@ -0,0 +1,115 @@
+import json
+import re
+from typing import Dict, Optional, Tuple
+
+
+# JSON schema every single-company analysis must satisfy
+ANALYSIS_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'summary': {'type': 'string', 'description': 'Concise 2-3 sentence summary of what the company does'},
+        'pitch': {'type': 'string', 'description': '2-3 sentence custom AI automation pitch QF Innovate could offer'},
+    },
+    'required': ['summary', 'pitch'],
+}
+JSON_RESPONSE_INSTRUCTIONS = 'Respond with ONLY a JSON object of the form {"summary": "...", "pitch": "..."}'
+MIN_FIELD_CHARS = 20
+MAX_FIELD_CHARS = 1500
+# Template text that means the model echoed the instructions instead of answering
+_PLACEHOLDERS = re.compile(r'^\s*(\.\.\.|\[.*\]|n/?a|none|null|tbd)\s*$|your (summary|pitch) here', re.IGNORECASE)
+
+
+class AnalysisValidationError(ValueError):
+    """An LLM answer that does not match ANALYSIS_SCHEMA; the message says why, for the re-ask."""
+
+
+def extract_json_object(text: str) -> str:
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end <= start:
+        raise AnalysisValidationError("the reply contained no JSON object")
+    return text[start:end + 1]
+
+
+def validate_analysis(data) -> Tuple[str, str]:
+    """Return (summary, pitch) from a decoded answer, or raise AnalysisValidationError."""
+    if not isinstance(data, dict):
+        raise AnalysisValidationError("the JSON value must be an object")
+    fields = []
+    for name in ANALYSIS_SCHEMA['required']:
+        value = data.get(name)
+        if not isinstance(value, str):
+            raise AnalysisValidationError(f'"{name}" must be a string')
+        value = value.strip()
+        if len(value) < MIN_FIELD_CHARS or _PLACEHOLDERS.search(value):
+            raise AnalysisValidationError(f'"{name}" must be a real answer of at least {MIN_FIELD_CHARS} characters')
+        if len(value) > MAX_FIELD_CHARS:
+            raise AnalysisValidationError(f'"{name}" must be at most {MAX_FIELD_CHARS} characters')
+        fields.append(value)
+    return fields[0], fields[1]
+
+
+def parse_analysis(text: str) -> Tuple[str, str]:
+    try:
+        data = json.loads(extract_json_object(text or ''))
+    except json.JSONDecodeError as e:
+        raise AnalysisValidationError(f"the JSON was malformed ({e.msg})")
+    return validate_analysis(data)
+
+
+def salvage_analysis(text: str) -> Optional[Tuple[str, str]]:
+    """Best-effort (summary, pitch) from a JSON reply that failed validation; '' for unusable fields.
+
+    Truncated JSON is scanned for complete string fields. Returns None when the
+    reply is not JSON at all, so plain-text heuristics can handle it instead.
+    """
+    text = (text or '').strip()
+    try:
+        data = json.loads(extract_json_object(text))
+    except (AnalysisValidationError, json.JSONDecodeError):
+        if not text.startswith(('{', '[', '```')) and '"summary"' not in text:
+            return None
+        data = {}
+        for name in ANALYSIS_SCHEMA['required']:
+            match = re.search(rf'"{name}"\s*:\s*"((?:[^"\\]|\\.)*)"', text)
+            if match:
+                try:
+                    data[name] = json.loads(f'"{match.group(1)}"')
+                except json.JSONDecodeError:
+                    pass
+    if not isinstance(data, dict):
+        return '', ''
+    fields = []
+    for name in ANALYSIS_SCHEMA['required']:
+        value = data.get(name)
+        usable = isinstance(value, str) and not _PLACEHOLDERS.search(value)
+        fields.append(value.strip()[:MAX_FIELD_CHARS] if usable else '')
+    return fields[0], fields[1]
+
+
+def build_reask_prompt(prompt: str, response_text: str, error: Exception) -> str:
+    """Repeat the original request, quoting the rejected reply and exactly what was wrong with it."""
+    return (
+        f"{prompt}\n\n"
+        f"Your previous reply could not be used because {error}.\n"
+        f"Previous reply:\n{(response_text or '')[:1000]}\n\n"
+        f"{JSON_RESPONSE_INSTRUCTIONS}, matching this JSON schema:\n{json.dumps(ANALYSIS_SCHEMA)}"
+    )
+
+
+def parse_success_report(counters: Dict[str, int]) -> Dict[str, float]:
+    """Summarise the llm_parse_* counters of a run: first-try parses, re-ask rescues and fallbacks."""
+    first_try = counters.get('llm_parse_ok', 0)
+    rescued = counters.get('llm_parse_reask_ok', 0)
+    fallback = counters.get('llm_parse_fallback', 0)
+    total = first_try + rescued + fallback
+    return {
+        'answers': total,
+        'parsed_first_try': first_try,
+        'parsed_after_reask': rescued,
+        'heuristic_fallback': fallback,
+        'reasks': counters.get('llm_reasks', 0),
+        'success_rate': round((first_try + rescued) / total, 4) if total else 0.0,
+    }
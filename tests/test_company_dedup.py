@@ -0,0 +1,23 @@
+import pytest
+
+from company_dedup import canonical_key
+
+
+@pytest.mark.parametrize('name, key', [
+    ('Slack Technologies', 'slack'),
+    ('Slack Technologies, Inc.', 'slack'),
+    ('Acme Software Systems', 'acme'),
+    ('The Home Depot', 'homedepot'),
+    # Descriptors only drop from the end, so names built from them keep their identity
+    ('Tech Data', 'techdata'),
+    ('International Paper', 'internationalpaper'),
+    # A short core keeps its descriptor rather than collapsing to a couple of letters
+    ('AB Group', 'abgroup'),
+])
+def test_canonical_key_strips_trailing_descriptors(name, key):
+    assert canonical_key(name) == key
+
+
+def test_canonical_key_keeps_distinct_companies_apart():
+    assert canonical_key('Tech Data') != canonical_key('Data Labs')
+    assert canonical_key('AB Group') != canonical_key('AB Systems')
@@ -0,0 +1,135 @@
+import asyncio
+import csv
+import importlib.util
+
+import pytest
+
+from async_enrichment import AsyncLeadEnrichmentBot
+from lead_enrichment_bot import CompanyData, LeadEnrichmentBot
+from lead_priority import QUALIFIED, SKIP_EXCLUDED_INDUSTRY, SKIP_LOW_SCORE, SKIP_NO_WEBSITE, LeadPolicy
+
+# name -> (industry, classifier confidence); 'Nowhere' has no website
+PROFILES = {
+    'Acme Cloud': ('Technology', 0.8),
+    'Beta Homes': ('Real Estate', 0.9),
+    'Gamma Bank': ('Finance', 0.5),
+    'Delta AI': ('Technology', 0.2),
+    'Nowhere': ('Other', 0.0),
+    'Echo Retail': ('Retail', 1.0),
+    'Foxtrot Labs': ('Technology', 1.0),
+}
+POLICY = LeadPolicy(exclude_industries=['Real Estate'], industry_weights={'Technology': 2.0}, min_score=0.8)
+
+
+class Interrupted(BaseException):
+    """Stands in for the process dying; unlike an Exception it is not turned into an error row."""
+
+
+def offline_company(company_name):
+    industry, confidence = PROFILES[company_name]
+    website = 'Unknown' if company_name == 'Nowhere' else f"https://{company_name.split()[0].lower()}.example"
+    company = CompanyData(name=company_name, website=website, industry=industry, industry_confidence=confidence)
+    return company, '' if website == 'Unknown' else f"{company_name} homepage"
+
+
+def analyzed_company(company):
+    company.summary = f"{company.name} summary"
+    company.automation_pitch = 'pitch'
+
+
+class OfflineTieredBot(LeadEnrichmentBot):
+    """Collects from PROFILES and records LLM-stage calls instead of making them."""
+
+    def __init__(self, crash_on=None, **kwargs):
+        super().__init__(lead_policy=POLICY, **kwargs)
+        self.crash_on = crash_on
+        self.analyzed = []
+
+    def collect_company_info(self, company_name):
+        return offline_company(company_name)
+
+    def analyze_company(self, company, website_content):
+        if company.name == self.crash_on:
+            raise Interrupted()
+        self.analyzed.append(company.name)
+        analyzed_company(company)
+
+
+class OfflineAsyncTieredBot(AsyncLeadEnrichmentBot):
+    def __init__(self, **kwargs):
+        super().__init__(lead_policy=POLICY, **kwargs)
+        self.analyzed = []
+
+    async def acollect_company_info(self, company_name):
+        return offline_company(company_name)
+
+    async def aanalyze_company(self, company, website_content):
+        self.analyzed.append(company.name)
+        analyzed_company(company)
+
+
+def write_input(tmp_path, names):
+    path = tmp_path / 'input.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['company_name'])
+        writer.writerows([name] for name in names)
+    return str(path)
+
+
+def test_tiered_run_analyzes_qualified_leads_best_first():
+    bot = OfflineTieredBot(priority_window=len(PROFILES))
+    rows = [row for _, row in bot.enrich_many(list(PROFILES))]
+
+    assert bot.analyzed == ['Foxtrot Labs', 'Acme Cloud', 'Delta AI', 'Echo Retail']
+    tiers = {row['company_name']: row['lead_tier'] for row in rows}
+    assert tiers['Beta Homes'] == SKIP_EXCLUDED_INDUSTRY
+    assert tiers['Gamma Bank'] == SKIP_LOW_SCORE
+    assert tiers['Nowhere'] == SKIP_NO_WEBSITE
+    assert [row['company_name'] for row in rows[:4]] == bot.analyzed
+
+
+def test_async_bot_only_analyzes_qualified_leads():
+    async def enrich_all(bot):
+        async with bot:
+            return [await bot.aenrich_company(name) for name in PROFILES]
+
+    bot = OfflineAsyncTieredBot()
+    companies = asyncio.run(enrich_all(bot))
+
+    assert bot.analyzed == ['Acme Cloud', 'Delta AI', 'Echo Retail', 'Foxtrot Labs']
+    assert [company.lead_tier for company in companies].count(QUALIFIED) == 4
+    assert {company.name: company.lead_score for company in companies}['Foxtrot Labs'] == 2.0
+
+
+def test_tiered_csv_resumes_from_the_last_whole_window(tmp_path):
+    names = list(PROFILES)
+    input_file = write_input(tmp_path, names)
+    output_file = str(tmp_path / 'out.csv')
+
+    # Window 2 (Delta AI, Nowhere, Echo Retail) dies after some of its rows were written
+    with pytest.raises(Interrupted):
+        OfflineTieredBot(crash_on='Echo Retail', priority_window=3).stream_csv(input_file, output_file)
+
+    resumed = OfflineTieredBot(priority_window=3)
+    assert resumed.stream_csv(input_file, output_file, resume=True) == len(names)
+    # Only rows from window 2 on are enriched again; window 1 was checkpointed whole
+    assert resumed.analyzed == ['Delta AI', 'Echo Retail', 'Foxtrot Labs']
+    with open(output_file, newline='', encoding='utf-8') as f:
+        assert sorted(row['company_name'] for row in csv.DictReader(f)) == sorted(names)
+
+
+@pytest.mark.skipif(importlib.util.find_spec('pyarrow') is None, reason='needs pyarrow')
+def test_lead_score_is_a_float_column_in_parquet(tmp_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    input_file = write_input(tmp_path, list(PROFILES))
+    output_file = str(tmp_path / 'out.parquet')
+    OfflineTieredBot().stream_csv(input_file, output_file)
+
+    table = pq.read_table(output_file)
+    assert table.schema.field('lead_score').type == pa.float64()
+    scores = dict(zip(table.column('company_name').to_pylist(), table.column('lead_score').to_pylist()))
+    assert scores['Foxtrot Labs'] == 2.0 and scores['Gamma Bank'] == 0.75
+    assert scores['Nowhere'] is None
@@ -0,0 +1,76 @@
+import importlib.util
+import os
+
+import pytest
+
+from lead_store import ParquetLeadStore, SqliteLeadStore, store_key
+
+needs_pyarrow = pytest.mark.skipif(importlib.util.find_spec('pyarrow') is None, reason='needs pyarrow')
+
+
+def lead(name, summary):
+    return {'company_name': name, 'website': f'https://{name.lower()}.example', 'summary_from_llm': summary}
+
+
+def latest_summaries(store):
+    return {row['company_name']: row['summary_from_llm'] for row in store.read_latest().to_pylist()}
+
+
+@needs_pyarrow
+def test_parquet_newest_write_wins_within_one_second(tmp_path, monkeypatch):
+    # A frozen wall clock: every write lands in the same second (and nanosecond)
+    monkeypatch.setattr('lead_store.time.time_ns', lambda: 1_700_000_000_000_000_000)
+    store = ParquetLeadStore(str(tmp_path / 'leads'))
+    for version in range(20):
+        store.upsert([lead('Acme', f'v{version}')])
+
+    assert latest_summaries(ParquetLeadStore(store.path)) == {'Acme': 'v19'}
+
+
+@needs_pyarrow
+def test_parquet_part_written_after_compaction_wins(tmp_path):
+    store = ParquetLeadStore(str(tmp_path / 'leads'))
+    store.upsert([lead('Acme', 'old'), lead('Beta', 'old')])
+    store.upsert([lead('Acme', 'new')])
+    assert store.compact() == 2
+    store.upsert([lead('Beta', 'newest')])
+
+    assert len(os.listdir(store.path)) == 2
+    assert latest_summaries(ParquetLeadStore(store.path)) == {'Acme': 'new', 'Beta': 'newest'}
+
+
+@needs_pyarrow
+def test_parquet_parts_sort_after_older_second_resolution_names(tmp_path):
+    store = ParquetLeadStore(str(tmp_path / 'leads'))
+    store.upsert([lead('Acme', 'new')])
+    # A file named the way older versions did, from an earlier run
+    legacy = ParquetLeadStore(str(tmp_path / 'legacy'))
+    legacy.upsert([lead('Acme', 'legacy')])
+    legacy_file = os.path.join(legacy.path, os.listdir(legacy.path)[0])
+    os.replace(legacy_file, os.path.join(store.path, 'part-20200101T000000-0123abcd.parquet'))
+
+    assert latest_summaries(ParquetLeadStore(store.path)) == {'Acme': 'new'}
+
+
+@pytest.mark.parametrize('name, key', [
+    ('Slack, Inc.', 'slack'),
+    ('  ACME corp ', 'acme'),
+    ('Acme GmbH', 'acme'),
+    # Descriptor words stay: these are different companies
+    ('Tech Data', 'tech data'),
+    ('Data Labs', 'data labs'),
+    ('Slack Technologies', 'slack technologies'),
+])
+def test_store_key_normalizes_case_punctuation_and_legal_suffix(name, key):
+    assert store_key(name) == key
+
+
+def test_sqlite_store_keeps_descriptor_named_leads_apart(tmp_path):
+    store = SqliteLeadStore(str(tmp_path / 'leads.sqlite'))
+    store.upsert([lead('Tech Data', 'distributor'), lead('Data Labs', 'analytics')])
+    store.upsert([lead('Tech Data Inc.', 'distributor, updated')])
+
+    assert store.count() == 2
+    assert store.previous('tech data')['summary_from_llm'] == 'distributor, updated'
+    assert store.previous('Data Labs')['summary_from_llm'] == 'analytics'
+    store.close()
@@ -0,0 +1,33 @@
+from prompt_context import build_context, estimate_tokens
+
+ABOUT = "Acme builds cloud software that helps logistics teams plan deliveries across the region."
+MENU = "Home Products Pricing Careers Blog Contact"
+COOKIES = "We use cookies to improve your experience. Accept all cookies or manage your privacy settings."
+
+
+def test_short_page_passes_through_unchanged():
+    # Menus and banners included: a page within the budget is sent as it is
+    page = f"{MENU}\n{ABOUT}\n\n{COOKIES}"
+    assert build_context(page, token_budget=estimate_tokens(page)) == page
+    assert build_context('', token_budget=10) == ''
+
+
+def test_long_page_keeps_relevant_passages_within_budget():
+    filler = ' '.join(f"Item {idx} ships in blue, red and green." for idx in range(200))
+    page = f"{COOKIES} {filler} {ABOUT}"
+    context = build_context(page, token_budget=100)
+
+    assert estimate_tokens(context) <= 100
+    assert ABOUT in context
+    assert 'cookies' not in context
+
+
+def test_long_page_backfills_the_budget_with_non_boilerplate_text():
+    filler = ' '.join(f"Item {idx} ships in blue, red and green." for idx in range(200))
+    page = f"{ABOUT} {COOKIES} {filler}"
+    context = build_context(page, token_budget=100)
+
+    # One passage reads as business text; the rest of the budget goes to the other non-boilerplate passages
+    assert context.startswith(ABOUT)
+    assert 80 < estimate_tokens(context) <= 100
+    assert 'cookies' not in context
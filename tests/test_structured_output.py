@@ -0,0 +1,72 @@
+import pytest
+
+from lead_enrichment_bot import FAILED_PITCH, CompanyData, LeadEnrichmentBot
+from structured_output import AnalysisValidationError, parse_analysis, salvage_analysis
+
+SUMMARY = "Acme builds cloud software for logistics teams."
+
+
+def test_salvage_keeps_fields_of_json_that_failed_validation():
+    reply = '{"summary": "Short.", "pitch": "Automate invoicing."}'
+    with pytest.raises(AnalysisValidationError):
+        parse_analysis(reply)
+    assert salvage_analysis(reply) == ('Short.', 'Automate invoicing.')
+
+
+def test_salvage_reads_complete_fields_of_truncated_json():
+    assert salvage_analysis(f'```json\n{{"summary": "{SUMMARY}", "pitch": "Automate the') == (SUMMARY, '')
+
+
+@pytest.mark.parametrize('reply', [
+    '{"summary": "your summary here", "pitch": 42}',
+    '{"summary": "...", "pitch": null}',
+    '["not", "an", "object"]',
+])
+def test_salvage_blanks_unusable_fields(reply):
+    assert salvage_analysis(reply) == ('', '')
+
+
+def test_salvage_leaves_plain_text_to_the_heuristics():
+    assert salvage_analysis('1. SUMMARY: Acme builds things\n2. PITCH: Automate them') is None
+
+
+class ScriptedBot(LeadEnrichmentBot):
+    """Answers every LLM call with `reply`, without any network access."""
+
+    def __init__(self, reply, **kwargs):
+        super().__init__(openai_api_key='k', max_reasks=0, **kwargs)
+        self.reply = reply
+
+    def _complete(self, provider, prompt, max_tokens=300, json_output=False, batch=False):
+        return self.reply
+
+
+@pytest.mark.parametrize('reply', [
+    f'{{"summary": "{SUMMARY}", "pitch": "tbd"}}',
+    f'1. SUMMARY: {SUMMARY}\n2. PITCH: Automate route planning.',
+])
+def test_fallback_answers_are_not_marked_analyzed(reply):
+    bot = ScriptedBot(reply)
+    company = CompanyData(name='Acme', industry='Technology')
+    bot.analyze_company(company, 'Acme homepage')
+
+    assert SUMMARY in company.summary
+    assert not company.llm_analyzed
+    assert bot.metrics.counters['llm_parse_fallback'] == 1
+
+
+def test_salvaged_reply_fills_unusable_fields_with_the_failure_text():
+    bot = ScriptedBot(f'{{"summary": "{SUMMARY}", "pitch": "tbd"}}')
+    company = CompanyData(name='Acme', industry='Technology')
+    bot.analyze_company(company, 'Acme homepage')
+
+    assert (company.summary, company.automation_pitch) == (SUMMARY, FAILED_PITCH)
+
+
+def test_validated_answer_is_marked_analyzed():
+    bot = ScriptedBot(f'{{"summary": "{SUMMARY}", "pitch": "Automate route planning for every depot."}}')
+    company = CompanyData(name='Acme', industry='Technology')
+    bot.analyze_company(company, 'Acme homepage')
+
+    assert company.summary == SUMMARY
+    assert company.llm_analyzed
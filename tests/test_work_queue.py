@@ -0,0 +1,178 @@
+import csv
+
+import pytest
+
+import work_queue
+from lead_enrichment_bot import CompanyData, LeadEnrichmentBot
+from work_queue import RETRY_DELAY, WorkQueue
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(work_queue, 'time', clock)
+    return clock
+
+
+def make_queue(tmp_path, names, max_attempts=3, item_size=2):
+    queue = WorkQueue(str(tmp_path / 'queue.sqlite'))
+    queue.open_input(str(tmp_path / 'input.csv'), max_attempts=max_attempts)
+    queue.enqueue(names, item_size=item_size)
+    queue.seal()
+    return queue
+
+
+def rows_for(item, tag):
+    return [{'company_name': name, 'summary_from_llm': tag} for name in item.company_names]
+
+
+def test_expired_lease_is_taken_over(tmp_path, clock):
+    queue = make_queue(tmp_path, ['A', 'B'])
+    first = queue.lease('w1', lease_seconds=10)
+    assert first.attempts == 1
+
+    clock.advance(5)
+    assert queue.lease('w2', lease_seconds=10) is None
+    assert queue.renew(first, 'w1', lease_seconds=10)
+
+    clock.advance(11)
+    second = queue.lease('w2', lease_seconds=10)
+    assert second.id == first.id
+    assert second.attempts == 2
+    # The original owner has lost the item: it can neither renew nor fail it
+    assert not queue.renew(first, 'w1')
+    queue.fail(first, 'w1', RuntimeError('late'))
+    assert queue.counts()['leased'] == 1
+
+
+def test_late_duplicate_completion_is_discarded(tmp_path, clock):
+    queue = make_queue(tmp_path, ['A', 'B'])
+    slow = queue.lease('slow', lease_seconds=10)
+    clock.advance(11)
+    fast = queue.lease('fast', lease_seconds=10)
+
+    assert queue.complete(fast, rows_for(fast, 'fast'))
+    assert not queue.complete(slow, rows_for(slow, 'slow'))
+
+    rows = list(queue.iter_rows())
+    assert [(number, name, row['summary_from_llm']) for number, name, row, _ in rows] == [
+        (0, 'A', 'fast'), (1, 'B', 'fast')]
+    assert queue.counts()['rows_done'] == 2
+    assert queue.finished()
+
+
+def test_failed_item_waits_for_backoff(tmp_path, clock):
+    queue = make_queue(tmp_path, ['A', 'B'], max_attempts=3)
+    item = queue.lease('w1')
+    assert queue.fail(item, 'w1', RuntimeError('boom'))
+
+    assert queue.lease('w1') is None
+    clock.advance(RETRY_DELAY - 0.1)
+    assert queue.lease('w1') is None
+    clock.advance(0.1)
+    retried = queue.lease('w1')
+    assert retried.attempts == 2
+
+    # The delay grows with each attempt
+    assert queue.fail(retried, 'w1', RuntimeError('boom'))
+    clock.advance(RETRY_DELAY)
+    assert queue.lease('w1') is None
+    clock.advance(RETRY_DELAY)
+    assert queue.lease('w1').attempts == 3
+
+
+def test_item_fails_after_max_attempts(tmp_path, clock):
+    queue = make_queue(tmp_path, ['A', 'B', 'C'], max_attempts=2)
+    for attempt in (1, 2):
+        item = queue.lease('w1')
+        assert item.start_row == 0 and item.attempts == attempt
+        retry = queue.fail(item, 'w1', RuntimeError(f'boom {attempt}'))
+        clock.advance(RETRY_DELAY * attempt)
+    assert not retry
+
+    remaining = queue.lease('w1')
+    assert remaining.start_row == 2
+    queue.complete(remaining, rows_for(remaining, 'ok'))
+
+    assert queue.counts()['failed'] == 1
+    assert queue.finished()
+    rows = list(queue.iter_rows())
+    assert [(row, error) for _, _, row, error in rows[:2]] == [(None, 'boom 2'), (None, 'boom 2')]
+    assert rows[2][2]['summary_from_llm'] == 'ok'
+
+
+def test_expired_last_attempt_marks_item_failed(tmp_path, clock):
+    queue = make_queue(tmp_path, ['A', 'B'], max_attempts=1)
+    queue.lease('w1', lease_seconds=10)
+    clock.advance(11)
+
+    assert queue.lease('w2') is None
+    assert queue.counts()['failed'] == 1
+    assert [error for _, _, _, error in queue.iter_rows()] == ['lease expired', 'lease expired']
+    assert queue.finished()
+
+
+class OfflineBot(LeadEnrichmentBot):
+    """Enriches without any network access; names starting with 'Broken' raise."""
+
+    def enrich_company(self, company_name: str) -> CompanyData:
+        if company_name.startswith('Broken'):
+            raise RuntimeError(f'cannot enrich {company_name}')
+        return CompanyData(name=company_name, website=f'https://{company_name.lower()}.example',
+                           industry='Technology', summary=f'{company_name} summary', automation_pitch='pitch')
+
+    def _enrich_row(self, company_name: str):
+        # The real _enrich_row turns errors into rows; raise instead so the work item fails
+        return self._company_row(self.enrich_company(company_name))
+
+
+def test_worker_retries_and_exports_in_input_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(work_queue, 'RETRY_DELAY', 0.0)
+    queue = make_queue(tmp_path, ['Acme', 'Beta', 'Broken Co', 'Delta', 'Echo'], max_attempts=2)
+    bot = OfflineBot()
+
+    assert bot.run_worker(queue, 'w1', poll_interval=0.01) == 2
+    counts = queue.counts()
+    assert (counts['done'], counts['failed'], counts['rows_done']) == (2, 1, 3)
+
+    output = tmp_path / 'out.csv'
+    assert bot.export_queue(queue, str(output)) == 5
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['company_name'] for row in rows] == ['Acme', 'Beta', 'Broken Co', 'Delta', 'Echo']
+    assert [row['website'] for row in rows] == [
+        'https://acme.example', 'https://beta.example', 'Error', 'Error', 'https://echo.example']
+    assert 'cannot enrich Broken Co' in rows[2]['summary_from_llm']
+
+
+def test_export_keeps_worker_columns_and_follows_extension(tmp_path):
+    pa_parquet = pytest.importorskip('pyarrow.parquet')
+    queue = make_queue(tmp_path, ['Acme', 'Beta'])
+    worker = OfflineBot(timing_column=True)
+    assert worker.run_worker(queue, 'w1', poll_interval=0.01) == 1
+
+    # The coordinator runs without --timing-column but still gets the workers' columns
+    output = tmp_path / 'out.parquet'
+    assert LeadEnrichmentBot().export_queue(queue, str(output)) == 2
+    table = pa_parquet.read_table(output)
+    assert table.column_names == worker.output_columns
+    assert table.column('company_name').to_pylist() == ['Acme', 'Beta']
+
+
+def test_worker_with_other_columns_is_refused(tmp_path):
+    queue = make_queue(tmp_path, ['Acme', 'Beta'])
+    OfflineBot(timing_column=True).run_worker(queue, 'w1', poll_interval=0.01)
+
+    with pytest.raises(ValueError, match='same --lead-policy and --timing-column'):
+        OfflineBot().run_worker(queue, 'w2', poll_interval=0.01)
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+
+class KeyedSemaphore:
+    """Caps how many callers may hold the same key (host, provider) at once."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, int(limit))
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    def _semaphore(self, key: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(key)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.limit)
+                self._semaphores[key] = semaphore
+            return semaphore
+
+    @contextmanager
+    def hold(self, key: str):
+        semaphore = self._semaphore(key or '')
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+class AsyncKeyedSemaphore:
+    """KeyedSemaphore for coroutines on one event loop; waiting yields to other tasks instead of a thread."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, int(limit))
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: str):
+        semaphore = self._semaphores.get(key or '')
+        if semaphore is None:
+            semaphore = self._semaphores[key or ''] = asyncio.Semaphore(self.limit)
+        async with semaphore:
+            yield
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_minute = float(rate_per_minute)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate_per_minute / 6))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_minute / 60.0)
+        self.updated_at = now
+
+    def try_take(self, amount: float, now: float) -> float:
+        """Take `amount` tokens if available and return 0, otherwise return seconds until they will be."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        return (amount - self.tokens) * 60.0 / self.rate_per_minute
+
+
+class AdaptiveRateLimiter:
+    """Requests/min and optional tokens/min buckets that adapt with AIMD.
+
+    Every healthy response adds `increase_step` requests/min (up to `max_rpm`);
+    every 429 multiplies the rate by `decrease_factor` (down to `min_rpm`).
+    The tokens/min budget scales with the same factor.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: Optional[float] = None,
+                 min_rpm: float = 1.0, max_rpm: Optional[float] = None,
+                 increase_step: float = 1.0, decrease_factor: float = 0.5):
+        self.base_rpm = float(requests_per_minute)
+        self.base_tpm = float(tokens_per_minute) if tokens_per_minute else None
+        self.min_rpm = min_rpm
+        self.max_rpm = max_rpm if max_rpm is not None else self.base_rpm * 2
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.requests = TokenBucket(self.base_rpm)
+        self.tokens = TokenBucket(self.base_tpm, capacity=self.base_tpm / 6) if self.base_tpm else None
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: int = 0) -> float:
+        """Take a slot if both buckets allow it and return 0, otherwise return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self.requests.try_take(1, now)
+            if wait == 0.0 and self.tokens is not None and tokens:
+                wait = self.tokens.try_take(tokens, now)
+                if wait:
+                    self.requests.tokens += 1
+            return wait
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until both buckets allow the call; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, tokens: int = 0) -> float:
+        """`acquire` for coroutines: sleeps on the event loop instead of blocking it."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def _set_rpm(self, rpm: float) -> None:
+        rpm = max(self.min_rpm, min(self.max_rpm, rpm))
+        self.requests.rate_per_minute = rpm
+        if self.tokens is not None:
+            self.tokens.rate_per_minute = self.base_tpm * rpm / self.base_rpm
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._set_rpm(self.requests.rate_per_minute + self.increase_step)
+
+    def record_throttled(self) -> None:
+        with self._lock:
+            self.throttled += 1
+            self._set_rpm(self.requests.rate_per_minute * self.decrease_factor)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'requests_per_minute': round(self.requests.rate_per_minute, 2),
+                'tokens_per_minute': round(self.tokens.rate_per_minute, 2) if self.tokens else None,
+                'throttled': self.throttled,
+            }
+
+
+class RateLimiterRegistry:
+    """Lazily creates one AdaptiveRateLimiter per key (provider name or domain)."""
+
+    def __init__(self, default_rpm: float, default_tpm: Optional[float] = None,
+                 overrides: Optional[Dict[str, Dict[str, float]]] = None):
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.overrides = overrides or {}
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+    def get(self, key: str) -> AdaptiveRateLimiter:
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                config = self.overrides.get(key, {})
+                limiter = AdaptiveRateLimiter(
+                    config.get('requests_per_minute', self.default_rpm),
+                    config.get('tokens_per_minute', self.default_tpm),
+                )
+                self._limiters[key] = limiter
+            return limiter
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {key: limiter.snapshot() for key, limiter in limiters.items()}
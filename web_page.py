@@ -0,0 +1,173 @@
+import codecs
+import re
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from lxml import etree
+
+
+MAX_TEXT_CHARS = 3000
+MAX_PAGE_BYTES = 1024 * 1024
+SKIPPED_TAGS = {"script", "style", "nav", "footer", "header"}
+# Elements whose text must not run into the next element's ("cookiesAbout us")
+WORD_BREAK_TAGS = {
+    "p", "div", "section", "article", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+    "br", "tr", "td", "th", "title", "blockquote", "dd", "dt", "main", "aside", "span", "a",
+}
+_HEADER_CHARSET = re.compile(r'charset=["\']?([a-zA-Z0-9_-]+)', re.IGNORECASE)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?\s*([a-zA-Z0-9_-]+)', re.IGNORECASE)
+
+
+@dataclass
+class WebPage:
+    """A homepage fetched and parsed once, shared by every enrichment stage."""
+    url: str
+    final_url: str = ""
+    status_code: int = 0
+    content: bytes = b""
+    meta_description: str = ""
+    text: str = ""
+    truncated: bool = False
+    # Set when the page was scored by a ParsePool worker alongside parsing
+    industry: str = ""
+    industry_confidence: float = 0.0
+    # Validators for the next conditional request (If-None-Match / If-Modified-Since)
+    etag: str = ""
+    last_modified: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code == 200
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
+def clean_text(text: str) -> str:
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    match = _HEADER_CHARSET.search(content_type or '')
+    if not match:
+        return None
+    try:
+        return codecs.lookup(match.group(1)).name
+    except LookupError:
+        return None
+
+
+def sniff_encoding(head: bytes) -> str:
+    """Encoding from a BOM or <meta charset> in the first bytes of a document, defaulting to UTF-8."""
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8'
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    match = _META_CHARSET.search(head[:4096])
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode('ascii')).name
+        except LookupError:
+            pass
+    return 'utf-8'
+
+
+class _TextCollector:
+    """lxml parser target that keeps only visible text and the meta description."""
+
+    def __init__(self):
+        self.meta_description = None
+        self.in_body = False
+        self.skip_depth = 0
+        self.parts = []
+        self.size = 0
+
+    def start(self, tag, attrib):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag == 'body':
+            self.in_body = True
+        elif tag == 'meta' and self.meta_description is None and attrib.get('name', '').lower() == 'description':
+            self.meta_description = attrib.get('content', '')
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+
+    def end(self, tag):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag in SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag in WORD_BREAK_TAGS and not self.skip_depth and self.parts and not self.parts[-1].endswith(' '):
+            self.parts.append(' ')
+            self.size += 1
+
+    def data(self, text):
+        if not self.skip_depth:
+            self.parts.append(text)
+            self.size += len(text)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return None
+
+
+class HtmlTextExtractor:
+    """Incremental extractor: feed raw bytes as they download and stop once enough text is in.
+
+    Unlike a full parse tree this never materialises the document, and
+    `feed` reports when the meta description and `max_chars` of visible text
+    have been seen so the caller can stop downloading.
+    """
+
+    def __init__(self, max_chars: int = MAX_TEXT_CHARS, encoding: Optional[str] = None):
+        self.max_chars = max_chars
+        self.encoding = encoding
+        self._collector = _TextCollector()
+        self._parser = None
+        self._checked_size = 0
+        self._text = None
+        self.done = False
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.done:
+            return True
+        if self._parser is None:
+            # Without a declared charset libxml2 falls back to Latin-1, so decide up front
+            self.encoding = self.encoding or sniff_encoding(chunk)
+            self._parser = etree.HTMLParser(target=self._collector, encoding=self.encoding)
+        try:
+            self._parser.feed(chunk)
+        except etree.Error:
+            self.done = True
+            return True
+        collector = self._collector
+        # Re-cleaning is the expensive part, so only re-check after a meaningful amount of new text
+        if collector.size >= self.max_chars and collector.size - self._checked_size >= 1000:
+            self._checked_size = collector.size
+            head_done = collector.in_body or collector.meta_description is not None
+            if head_done and len(clean_text(''.join(collector.parts))) >= self.max_chars:
+                self.done = True
+        return self.done
+
+    def result(self) -> Tuple[str, str]:
+        """Return (meta description, cleaned visible text)."""
+        if self._text is None:
+            if not self.done and self._parser is not None:
+                try:
+                    self._parser.close()
+                except etree.Error:
+                    pass
+            self._text = clean_text(''.join(self._collector.parts))[:self.max_chars]
+        return (self._collector.meta_description or '').strip(), self._text
+
+
+def parse_html(content: bytes, max_chars: int = MAX_TEXT_CHARS, encoding: Optional[str] = None) -> Tuple[str, str]:
+    """Return (meta description, cleaned visible text) for a raw HTML document."""
+    extractor = HtmlTextExtractor(max_chars, encoding=encoding)
+    for start in range(0, len(content), 65536):
+        if extractor.feed(content[start:start + 65536]):
+            break
+    return extractor.result()
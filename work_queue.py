@@ -0,0 +1,260 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ITEM_SIZE = 100
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+# Seconds before a failed item may be leased again, multiplied by its attempt count
+RETRY_DELAY = 5.0
+
+
+@dataclass
+class WorkItem:
+    id: int
+    start_row: int
+    company_names: List[str]
+    attempts: int
+
+
+class WorkQueue:
+    """SQLite work queue shared by one coordinator and any number of worker processes.
+
+    The coordinator splits the input into items of consecutive rows. A worker
+    leases an item for `lease_seconds`, renews the lease while it works and
+    completes it with one row per company. Items whose lease runs out are
+    handed to the next worker; an item that fails `max_attempts` times is
+    marked failed. Results are keyed by input row number and the first
+    completion of an item wins, so a slow worker finishing after its lease was
+    taken over cannot duplicate rows.
+
+    SQLite locking needs a local disk: run the workers on one box, or point
+    remote nodes at a filesystem with working POSIX locks.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS items ('
+            ' id INTEGER PRIMARY KEY, start_row INTEGER NOT NULL, company_names TEXT NOT NULL,'
+            " status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0,"
+            ' lease_owner TEXT, lease_expires REAL, available_at REAL NOT NULL DEFAULT 0,'
+            ' last_error TEXT, updated_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS items_status ON items (status, available_at)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            ' row_number INTEGER PRIMARY KEY, item_id INTEGER NOT NULL, row TEXT NOT NULL)'
+        )
+
+    def _transaction(self):
+        return _Transaction(self._conn, self._lock)
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value) -> None:
+        self._conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+    @property
+    def max_attempts(self) -> int:
+        return int(self._meta('max_attempts') or DEFAULT_MAX_ATTEMPTS)
+
+    @property
+    def columns(self) -> Optional[List[str]]:
+        """Output columns of the stored rows, once a worker has bound them."""
+        value = self._meta('columns')
+        return json.loads(value) if value else None
+
+    def bind_columns(self, columns: List[str]) -> None:
+        """Record the output columns a worker writes; a worker writing different columns is refused."""
+        with self._transaction():
+            bound = self._meta('columns')
+            if bound is None:
+                self._set_meta('columns', json.dumps(list(columns)))
+            elif json.loads(bound) != list(columns):
+                raise ValueError(f"Queue {self.path} holds rows with columns {json.loads(bound)}, not {list(columns)}; "
+                                 f"start every worker with the same --lead-policy and --timing-column")
+
+    @property
+    def sealed(self) -> bool:
+        """True once the coordinator has enqueued the whole input."""
+        return self._meta('sealed') == '1'
+
+    def open_input(self, input_file: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """Bind the queue to `input_file` and return how many of its rows are already enqueued.
+
+        Re-running the coordinator on the same queue resumes enqueueing where it stopped.
+        """
+        input_file = os.path.abspath(input_file)
+        with self._transaction():
+            bound = self._meta('input_file')
+            if bound is not None and bound != input_file:
+                raise ValueError(f"Queue {self.path} belongs to {bound}")
+            if bound is None:
+                self._set_meta('input_file', input_file)
+                self._set_meta('max_attempts', max_attempts)
+            row = self._conn.execute('SELECT start_row, company_names FROM items ORDER BY start_row DESC LIMIT 1').fetchone()
+        return row[0] + len(json.loads(row[1])) if row else 0
+
+    def enqueue(self, company_names: Iterable[str], start_row: int = 0,
+                item_size: int = DEFAULT_ITEM_SIZE, items_per_commit: int = 50) -> int:
+        """Split `company_names` (input rows from `start_row` on) into items; returns the items added."""
+        added = 0
+        names = []
+        batch = []
+
+        def flush():
+            with self._transaction():
+                self._conn.executemany(
+                    'INSERT INTO items (start_row, company_names, updated_at) VALUES (?, ?, ?)', batch)
+            batch.clear()
+
+        for name in company_names:
+            names.append(str(name))
+            if len(names) == item_size:
+                batch.append((start_row, json.dumps(names, ensure_ascii=False), time.time()))
+                start_row += len(names)
+                names = []
+                added += 1
+                if len(batch) >= items_per_commit:
+                    flush()
+        if names:
+            batch.append((start_row, json.dumps(names, ensure_ascii=False), time.time()))
+            added += 1
+        if batch:
+            flush()
+        return added
+
+    def seal(self) -> None:
+        with self._transaction():
+            self._set_meta('sealed', 1)
+
+    def lease(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[WorkItem]:
+        """Claim the oldest available item for `worker_id`, or None if nothing is available right now."""
+        now = time.time()
+        with self._transaction():
+            # Expired leases count as a failed attempt; give up on items that have used them all
+            self._conn.execute(
+                "UPDATE items SET status = 'failed', last_error = 'lease expired', updated_at = ?"
+                " WHERE status = 'leased' AND lease_expires <= ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = self._conn.execute(
+                "SELECT id, start_row, company_names, attempts FROM items"
+                " WHERE (status = 'pending' AND available_at <= ?) OR (status = 'leased' AND lease_expires <= ?)"
+                " ORDER BY start_row LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE items SET status = 'leased', lease_owner = ?, lease_expires = ?,"
+                " attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row[0]),
+            )
+        return WorkItem(row[0], row[1], json.loads(row[2]), row[3] + 1)
+
+    def renew(self, item: WorkItem, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extend a lease; False means another worker has taken the item over."""
+        now = time.time()
+        with self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE items SET lease_expires = ?, updated_at = ?"
+                " WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + lease_seconds, now, item.id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, item: WorkItem, rows: List[Dict[str, str]]) -> bool:
+        """Store one row per company of `item`; returns False if the item was already completed."""
+        if len(rows) != len(item.company_names):
+            raise ValueError(f"Item {item.id} has {len(item.company_names)} companies but got {len(rows)} rows")
+        now = time.time()
+        with self._transaction():
+            status = self._conn.execute('SELECT status FROM items WHERE id = ?', (item.id,)).fetchone()[0]
+            if status == 'done':
+                return False
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO results (row_number, item_id, row) VALUES (?, ?, ?)',
+                [(item.start_row + idx, item.id, json.dumps(row, ensure_ascii=False)) for idx, row in enumerate(rows)],
+            )
+            self._conn.execute(
+                "UPDATE items SET status = 'done', lease_owner = NULL, lease_expires = NULL,"
+                " last_error = NULL, updated_at = ? WHERE id = ?",
+                (now, item.id),
+            )
+        return True
+
+    def fail(self, item: WorkItem, worker_id: str, error: Exception) -> bool:
+        """Give a leased item back after an error; returns True if it will be retried."""
+        now = time.time()
+        retry = item.attempts < self.max_attempts
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE items SET status = ?, lease_owner = NULL, lease_expires = NULL, available_at = ?,"
+                " last_error = ?, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                ('pending' if retry else 'failed', now + RETRY_DELAY * item.attempts, str(error)[:1000],
+                 now, item.id, worker_id),
+            )
+        return retry
+
+    def counts(self) -> Dict[str, int]:
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        for status, count in self._conn.execute('SELECT status, COUNT(*) FROM items GROUP BY status'):
+            counts[status] = count
+        counts['rows_done'] = self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        return counts
+
+    def finished(self) -> bool:
+        """True once everything is enqueued and every item is done or failed."""
+        counts = self.counts()
+        return self.sealed and counts['pending'] == 0 and counts['leased'] == 0
+
+    def iter_rows(self) -> Iterator[Tuple[int, str, Optional[Dict[str, str]], Optional[str]]]:
+        """Yield (row number, company name, result row or None, last error) for every input row, in order."""
+        items = self._conn.execute('SELECT id, start_row, company_names, last_error FROM items ORDER BY start_row')
+        for item_id, start_row, company_names, last_error in items.fetchall():
+            stored = {
+                row_number: json.loads(row)
+                for row_number, row in self._conn.execute('SELECT row_number, row FROM results WHERE item_id = ?', (item_id,))
+            }
+            for idx, name in enumerate(json.loads(company_names)):
+                yield start_row + idx, name, stored.get(start_row + idx), last_error
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, so concurrent processes serialise on the SQLite write lock."""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock):
+        self._conn = conn
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire()
+        self._conn.execute('BEGIN IMMEDIATE')
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        finally:
+            self._lock.release()
+        return False